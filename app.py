@@ -1,37 +1,124 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-from planner.production import allocate_production
-from planner.shipment import enhanced_truck_planning
-from planner.metrics import calculate_metrics, highlight_violations
-from planner.forecasting import forecast_demand
+import os
+from planner.pipeline import PlanningPipeline, freeze
+from planner.ingest import (load_demand_upload, export_frame, load_plan, plan_columns, list_saved_plans,
+                            EXPORT_FORMATS, PLAN_DIR, UPLOAD_TYPES)
+from planner.streaming import plan_streaming
+from planner.scenarios import scenario_grid, run_scenario_sweep
+from planner.simulation import fit_noise_model, simulate_demand_risk
+from planner.metrics import highlight_violations, classify_violations, violation_mask, KPI_LEVELS, LOW_UTILIZATION, VIOLATION_COLORS
+from planner.shipment import DEFAULT_FLEET
+from planner.forecasting import forecast_demand, backtest_forecast
 from planner.anomaly import detect_anomalies
-from planner.clustering import cluster_skus
-from database.db_utils import create_tables, save_shipment_plan  # New import
+from planner.clustering import cluster_skus, cluster_quality
+from planner.events import EventCalendar
+from planner.profiling import StageProfiler
+from database.db_utils import create_tables, save_shipment_plan, new_run_id
+from database.plan_queries import aggregate_plan, aggregate_frame, filter_mask, violation_counts, load_plan_page
 
 
 st.set_page_config(page_title="Cola Planning Dashboard", layout="wide", page_icon="🥤")
 
 
-def apply_festival_multiplier(df, festival_weeks=[10, 15, 20], multiplier=1.5):
-    df = df.copy()
-    df['demand'] = df.apply(lambda row:
-        row['demand'] * multiplier if row['week'] in festival_weeks else row['demand'], axis=1)
-    return df
+def plan_aggregate(plan_df, by, aggregates, kpis=None, **filters):
+    levels = (by,) if isinstance(by, str) else tuple(by)
+    if kpis is not None and levels in KPI_LEVELS and all(values is None for values in filters.values()):
+        return kpis.by(levels, aggregates)
+    run_id = st.session_state.get('saved_run_id')
+    if run_id is not None:
+        return aggregate_plan(run_id, by, aggregates, **filters)
+    return aggregate_frame(plan_df, by, aggregates, **filters)
+
+
+def plan_view(plan_df, key, utilization_threshold, filters):
+    run_id = st.session_state.get('saved_run_id')
+    cache = st.session_state.setdefault(f"{key}_view", {})
+    if cache.get('plan') is not plan_df or cache.get('source') != (run_id, utilization_threshold):
+        cache.clear()
+        cache['plan'], cache['source'] = plan_df, (run_id, utilization_threshold)
+        if run_id is None:
+            cache['status'] = classify_violations(plan_df, utilization_threshold)
+    filter_key = freeze(filters)
+    if filter_key not in cache:
+        if run_id is not None:
+            counts = violation_counts(run_id, utilization_threshold, **filters)
+            cache[filter_key] = {'counts': counts}
+        else:
+            rows = np.flatnonzero(filter_mask(plan_df, **filters))
+            status = cache['status'][rows]
+            cache[filter_key] = {'counts': pd.Series(status).value_counts().to_dict(),
+                                 'rows': rows, 'violations': rows[violation_mask(status)]}
+    return cache['status'] if run_id is None else None, cache[filter_key]
+
+
+def show_plan_page(plan_df, key, utilization_threshold=LOW_UTILIZATION, page_size=500, **filters):
+    run_id = st.session_state.get('saved_run_id')
+    status, view = plan_view(plan_df, key, utilization_threshold, filters)
+    counts = {name: view['counts'][name] for name in VIOLATION_COLORS if view['counts'].get(name)}
+    st.caption(" • ".join(f"{name.replace('_', ' ').title()}: {count:,}" for name, count in counts.items()))
+    col1, col2 = st.columns([1, 3])
+    violations_only = col1.checkbox("Violations only", key=f"{key}_violations_only")
+    n_rows = sum(count for name, count in counts.items() if not violations_only or name != 'ok')
+    n_pages = max(1, -(-n_rows // page_size))
+    page = col2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key=f"{key}_page")
+    if run_id is not None:
+        page_df = load_plan_page(run_id, utilization_threshold, page_size, (page - 1) * page_size,
+                                 violations_only, **filters)
+    else:
+        rows = view['violations'] if violations_only else view['rows']
+        page_rows = rows[(page - 1) * page_size:page * page_size]
+        page_df = plan_df.iloc[page_rows].assign(status=status[page_rows])
+    st.dataframe(highlight_violations(page_df), use_container_width=True)
+
+
+def start_profiler(mode=None):
+    profiler = StageProfiler(mode)
+    st.session_state['pipeline'].profiler = profiler
+    st.session_state['profiler'] = profiler
+    return profiler
+
+
+def show_performance_panel():
+    profiler = st.session_state.get('profiler')
+    if profiler is None or not profiler.records:
+        return
+    with st.expander("⏱️ Performance"):
+        st.dataframe(profiler.to_frame(), use_container_width=True)
+        st.download_button("📥 Download Performance Report (JSON)", profiler.to_json(),
+                           "performance_report.json", "application/json", key="performance_json")
+        for record in profiler.records:
+            if record.get('profile'):
+                st.markdown(f"**{record['stage']}**")
+                st.code(record['profile'])
 
 
 if 'shipment_df' not in st.session_state:
     st.session_state['shipment_df'] = None
 if 'forecast_df' not in st.session_state:
     st.session_state['forecast_df'] = None
+if 'forecast_accuracy' not in st.session_state:
+    st.session_state['forecast_accuracy'] = None
 if 'metrics' not in st.session_state:
     st.session_state['metrics'] = None
 if 'anomaly_df' not in st.session_state:
     st.session_state['anomaly_df'] = None
 if 'clusters_df' not in st.session_state:
     st.session_state['clusters_df'] = None
+if 'stream_metrics' not in st.session_state:
+    st.session_state['stream_metrics'] = None
+if 'risk_summary' not in st.session_state:
+    st.session_state['risk_summary'] = None
+    st.session_state['risk_rows'] = None
+if 'sweep_df' not in st.session_state:
+    st.session_state['sweep_df'] = None
+if 'saved_run_id' not in st.session_state:
+    st.session_state['saved_run_id'] = None
+if 'pipeline' not in st.session_state:
+    st.session_state['pipeline'] = PlanningPipeline()
+if 'profiler' not in st.session_state:
+    st.session_state['profiler'] = None
 
 
 # Ensure database table exists at app start
@@ -102,23 +189,51 @@ sample_data = pd.DataFrame({
 
 with st.sidebar:
     st.header("📂 Data Upload")
+    export_format = st.selectbox("File Format", list(EXPORT_FORMATS),
+                                 help="Format for the template and all result downloads")
+    export_extension, export_mime = EXPORT_FORMATS[export_format]
     st.download_button(
-        "📥 Download Template CSV",
-        data=sample_data.to_csv(index=False).encode('utf-8'),
-        file_name="sample_demand.csv",
-        mime="text/csv",
+        f"📥 Download Template {export_format}",
+        data=export_frame(sample_data, export_format),
+        file_name=f"sample_demand.{export_extension}",
+        mime=export_mime,
         use_container_width=True,
-        help="Download sample CSV format"
+        help="Download sample file format"
     )
-    uploaded_file = st.file_uploader("📂 Upload CSV File", type="csv", help="Upload your weekly demand data")
+    uploaded_file = st.file_uploader("📂 Upload Demand File", type=UPLOAD_TYPES,
+                                     help="Upload your weekly demand data (CSV, Parquet or Feather/Arrow)")
+    saved_plan_name = st.selectbox("📂 Open Saved Plan", [None] + list_saved_plans(),
+                                   format_func=lambda name: name or "—",
+                                   help="Parquet or Feather plans in data/plans are memory-mapped and only the "
+                                        "selected columns are read")
+    stream_upload = st.checkbox("Streaming Mode (large files)",
+                                help="Plan the file in chunks and write results straight to the database")
+    if stream_upload:
+        stream_chunk_rows = st.number_input("Rows per Chunk", 10000, 5000000, 500000, 10000)
     st.divider()
     st.header("⚙️ Planning Parameters")
     max_capacity = st.slider("Max Plant Capacity (units per week)", 100000, 200000, 150000, 5000)
+    allocation_method = st.selectbox("Allocation Method", ["Proportional", "Largest Remainder", "Cost Optimized"],
+                                     help="Largest Remainder fills weekly capacity exactly; Cost Optimized solves an LP "
+                                          "over production, trucking and holding cost")
+    if allocation_method == "Cost Optimized":
+        st.caption("Cost Optimized plans receipts one lead time ahead, so the last lead-time weeks of every "
+                   "SKU/DC get no allocation (their demand falls outside the horizon) and service level "
+                   "reads lower than Proportional.")
     truck_size = st.selectbox("Truck Size (units)", [5000, 10000, 20000], index=1)
     safety_stock = st.slider("Safety Stock (min units per SKU per DC)", 1000, 10000, 5000, 500)
     st.subheader("🚛 Truck Planning Options")
-    truck_strategy = st.selectbox("Truck Assignment Strategy", ["Partial Trucks", "Consolidation", "Next Week Batching"])
+    truck_strategy = st.selectbox("Truck Assignment Strategy", ["Partial Trucks", "Consolidation", "Next Week Batching", "Mixed Fleet"])
+    fleet = None
+    if truck_strategy == "Mixed Fleet":
+        fleet_types = st.multiselect("Available Truck Types (units)", [5000, 10000, 20000], default=[5000, 10000, 20000])
+        fleet = {
+            f"{capacity // 1000}k": (capacity, st.number_input(f"Cost per {capacity:,}-unit Truck", 0.0, 5000.0,
+                                                             DEFAULT_FLEET[f"{capacity // 1000}k"][1], 10.0))
+            for capacity in fleet_types
+        } or None
     partial_threshold = st.slider("Partial Truck Threshold (%)", 30, 80, 60) / 100
+    utilization_alert = st.slider("Low Utilization Alert (%)", 50, 95, LOW_UTILIZATION, 5)
     st.subheader("🤖 Advanced Features")
     use_advanced = st.checkbox("Enable Advanced ML Features")
     if use_advanced:
@@ -128,19 +243,88 @@ with st.sidebar:
         lead_time_north = st.slider("Lead Time North DC (weeks)", 1, 4, 1)
         lead_time_south = st.slider("Lead Time South DC (weeks)", 1, 4, 2)
         lead_time_map = {'North': lead_time_north, 'South': lead_time_south}
+        opening_stock = st.number_input("Opening DC Inventory (units per SKU)", 0, 1000000, 10000, 1000)
         forecast_periods = st.slider("Forecast Periods", 4, 12, 8)
+        anomaly_method = st.selectbox("Anomaly Detector", ["Isolation Forest", "Robust Z"],
+                                      help="Robust Z flags outliers against each SKU/DC median and is much faster")
+        risk_trials = st.slider("Monte Carlo Demand Trials", 0, 10000, 1000, 500,
+                                help="Number of simulated demand scenarios for service-level risk (0 disables)")
+        profile_mode = {"Timing Only": None, "Tracemalloc": 'tracemalloc', "cProfile": 'cprofile'}[
+            st.selectbox("Profiling Mode", ["Timing Only", "Tracemalloc", "cProfile"],
+                         help="Tracemalloc records per-stage peak memory; cProfile records the slowest calls")]
+        forecast_model_label = st.selectbox("Forecast Model", ["Mean", "Exponential Smoothing", "Holt Trend", "Seasonal Naive"])
+        forecast_model = {
+            "Mean": "mean",
+            "Exponential Smoothing": "ses",
+            "Holt Trend": "holt",
+            "Seasonal Naive": "seasonal_naive"
+        }[forecast_model_label]
+        event_calendar = EventCalendar()
         enable_festival = st.checkbox("Enable Festival Demand Modeling")
         if enable_festival:
             festival_weeks = st.multiselect("Festival Weeks", list(range(1, 53)), default=[10, 15, 20])
             festival_multiplier = st.slider("Festival Demand Multiplier", 1.2, 2.0, 1.5, 0.1)
+            if festival_weeks:
+                event_calendar.add_event('festival', festival_weeks, festival_multiplier)
+        enable_promotion = st.checkbox("Enable Promotions")
+        if enable_promotion:
+            promotion_skus = [sku.strip() for sku in st.text_input("Promotion SKUs (comma-separated, blank = all)").split(",") if sku.strip()]
+            promotion_weeks = st.multiselect("Promotion Weeks", list(range(1, 53)), default=[])
+            promotion_uplift = st.slider("Promotion Uplift", 1.05, 2.0, 1.2, 0.05)
+            if promotion_weeks:
+                event_calendar.add_event('promotion', promotion_weeks, promotion_uplift,
+                                         skus=promotion_skus or None, kind='promotion')
     else:
+        cost_production, cost_transport, cost_inventory = 1.0, 200.0, 0.5
         lead_time_map = {'North': 1, 'South': 2}
+        opening_stock = 0
         forecast_periods = 8
-        enable_festival = False
+        risk_trials = 0
+        anomaly_method = "Isolation Forest"
+        profile_mode = None
+        forecast_model = 'mean'
+        event_calendar = EventCalendar()
+    lp_options = {
+        'lead_time_map': lead_time_map,
+        'truck_size': truck_size,
+        'safety_stock': safety_stock,
+        'opening_stock': opening_stock,
+        'production_cost': cost_production,
+        'transport_cost': cost_transport,
+        'inventory_cost': cost_inventory
+    }
 
 
-if uploaded_file:
-    demand_df = pd.read_csv(uploaded_file)
+if uploaded_file and stream_upload:
+    st.info("🌊 Streaming mode: the file is planned chunk by chunk and results are written to the database.")
+    if allocation_method != "Proportional":
+        st.warning(f"Streaming mode always uses Proportional allocation; the selected "
+                   f"{allocation_method} method is ignored. Turn off Streaming Mode to use it.")
+    if st.sidebar.button("🚀 Simulate Scenario (Streaming)", type="primary"):
+        stream_run_id = new_run_id()
+        st.session_state['stream_metrics'] = plan_streaming(
+            uploaded_file,
+            max_capacity=max_capacity,
+            truck_size=truck_size,
+            strategy=truck_strategy.lower().replace(" ", "_"),
+            partial_threshold=partial_threshold,
+            safety_stock=safety_stock,
+            fleet=fleet,
+            chunksize=int(stream_chunk_rows),
+            sink=lambda chunk_df: save_shipment_plan(chunk_df, run_id=stream_run_id)
+        )
+        st.session_state['stream_run_id'] = stream_run_id
+    stream_metrics = st.session_state.get('stream_metrics')
+    if stream_metrics is not None:
+        st.markdown("### 🛠️ Production & Shipment Recommendations")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Service Level", f"{stream_metrics['service_level']:.1f}%")
+        c2.metric("Truck Utilization", f"{stream_metrics['truck_utilization']:.1f}%")
+        c3.metric("Safety Stock Met", "✔️" if stream_metrics['all_safety_met'] else "❌")
+        c4.metric("Total Trucks", f"{stream_metrics['total_trucks']}")
+        st.success(f"Planning results were saved to the database as run {st.session_state.get('stream_run_id')}.")
+elif uploaded_file:
+    upload_key, demand_df, demand_summary = load_demand_upload(uploaded_file.getvalue(), uploaded_file.name)
     st.success("✅ Data loaded successfully!")
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -148,25 +332,31 @@ if uploaded_file:
         st.dataframe(demand_df, use_container_width=True)
     with col2:
         st.subheader("📈 Data Summary")
-        st.metric("Total SKUs", len(demand_df['sku'].unique()))
-        st.metric("Total DCs", len(demand_df['dc'].unique()))
-        st.metric("Total Weeks", len(demand_df['week'].unique()))
-        st.metric("Total Demand", f"{demand_df['demand'].sum():,}")
+        st.metric("Total SKUs", demand_summary['total_skus'])
+        st.metric("Total DCs", demand_summary['total_dcs'])
+        st.metric("Total Weeks", demand_summary['total_weeks'])
+        st.metric("Total Demand", f"{demand_summary['total_demand']:,}")
 
 
     if not use_advanced:
         simulate_button = st.sidebar.button("🚀 Simulate Scenario", type="primary")
         if simulate_button:
-            result_df = allocate_production(demand_df, max_capacity)
-            result_df = enhanced_truck_planning(
-                result_df, 
-                truck_size, 
-                truck_strategy.lower().replace(" ", "_"), 
-                partial_threshold, 
-                safety_stock
+            start_profiler(profile_mode)
+            result_df, metrics = st.session_state['pipeline'].run(
+                demand_df,
+                max_capacity=max_capacity,
+                allocation_method=allocation_method.lower().replace(" ", "_"),
+                truck_size=truck_size,
+                strategy=truck_strategy.lower().replace(" ", "_"),
+                partial_threshold=partial_threshold,
+                safety_stock=safety_stock,
+                fleet=fleet,
+                lp_options=lp_options,
+                data_key=upload_key
             )
             st.session_state['shipment_df'] = result_df
-            st.session_state['metrics'] = calculate_metrics(result_df)
+            st.session_state['metrics'] = metrics
+            st.session_state['saved_run_id'] = None
         if st.session_state.get('shipment_df') is not None and st.session_state.get('metrics') is not None:
             result_df = st.session_state['shipment_df']
             metrics = st.session_state['metrics']
@@ -182,7 +372,7 @@ if uploaded_file:
             c1.metric("Service Level", f"{metrics.get('service_level', 0):.1f}%")
             c2.metric("Truck Utilization", f"{metrics.get('truck_utilization', 0):.1f}%")
             c3.metric("Safety Stock Met", "✔️" if metrics.get('all_safety_met', False) else "❌")
-            c4.metric("Total Trucks", f"{result_df.get('total_trucks', pd.Series([0])).sum()}")
+            c4.metric("Total Trucks", f"{metrics.get('total_trucks', 0)}")
             st.markdown("### 📊 Planning Results")
             col1, col2 = st.columns(2)
             with col1:
@@ -191,62 +381,117 @@ if uploaded_file:
             with col2:
                 dc_filter = st.multiselect("Select Distribution Centers", options=result_df['dc'].unique(), default=result_df['dc'].unique(), key="dc_filter_simple")
             if week_filter and dc_filter:
-                filtered_df = result_df[(result_df['week'].isin(week_filter)) & (result_df['dc'].isin(dc_filter))]
-                st.dataframe(highlight_violations(filtered_df), use_container_width=True)
+                show_plan_page(result_df, "simple_plan", utilization_alert, weeks=week_filter, dcs=dc_filter)
             else:
-                st.dataframe(highlight_violations(result_df), use_container_width=True)
+                show_plan_page(result_df, "simple_plan", utilization_alert)
             st.download_button(
                 "📥 Download Planning Results",
-                result_df.to_csv(index=False).encode('utf-8'),
-                "shipment_plan.csv",
-                "text/csv",
+                export_frame(result_df, export_format),
+                f"shipment_plan.{export_extension}",
+                export_mime,
                 use_container_width=True
             )
             # New button to save result into database
             if st.button("💾 Save Planning Results to Database"):
-                save_shipment_plan(result_df)
-                st.success("Planning results saved to the database successfully!")
+                st.session_state['saved_run_id'] = save_shipment_plan(result_df)
+                st.success(f"Planning results saved to the database as run {st.session_state['saved_run_id']}.")
             if st.button("📈 View Analytics Dashboard"):
+                import plotly.express as px
                 tab1, tab2, tab3 = st.tabs(["Distribution Analysis", "Weekly Planning", "Performance Metrics"])
                 with tab1:
                     col1, col2 = st.columns(2)
                     with col1:
-                        fig_pie = px.pie(result_df, names='sku', values='demand', title='Demand Distribution by SKU')
+                        fig_pie = px.pie(plan_aggregate(result_df, 'sku', ['demand'], kpis=metrics.get('kpis')), names='sku', values='demand',
+                                         title='Demand Distribution by SKU')
                         st.plotly_chart(fig_pie, use_container_width=True)
                     with col2:
-                        fig_pie2 = px.pie(result_df, names='dc', values='demand', title='Demand Distribution by DC')
+                        fig_pie2 = px.pie(plan_aggregate(result_df, 'dc', ['demand'], kpis=metrics.get('kpis')), names='dc', values='demand',
+                                          title='Demand Distribution by DC')
                         st.plotly_chart(fig_pie2, use_container_width=True)
                 with tab2:
-                    weekly_alloc = result_df.groupby(['week', 'dc'])['allocated'].sum().reset_index()
+                    weekly_alloc = plan_aggregate(result_df, ['week', 'dc'], ['allocated'], kpis=metrics.get('kpis'))
                     fig_bar = px.bar(weekly_alloc, x='week', y='allocated', color='dc', barmode='group',
                                      title='Allocated Production by Week and Distribution Center')
                     st.plotly_chart(fig_bar, use_container_width=True)
                     if 'total_trucks' in result_df.columns:
-                        truck_usage = result_df.groupby('week')['total_trucks'].sum().reset_index()
+                        truck_usage = plan_aggregate(result_df, 'week', ['total_trucks'], kpis=metrics.get('kpis'))
                         fig_truck = px.line(truck_usage, x='week', y='total_trucks', title='Weekly Truck Usage')
                         st.plotly_chart(fig_truck, use_container_width=True)
                 with tab3:
-                    safety_rate = result_df.groupby('week')['safety_met'].mean().reset_index()
+                    safety_rate = plan_aggregate(result_df, 'week', ['safety_met'], kpis=metrics.get('kpis'))
                     fig_safety = px.line(safety_rate, x='week', y='safety_met',
                                          title='Weekly Safety Stock Compliance Rate')
                     fig_safety.update_yaxes(tickformat=".0%", range=[0, 1])
                     st.plotly_chart(fig_safety, use_container_width=True)
+            with st.expander("🧪 Scenario Sweep"):
+                st.caption("Runs every combination of the selected parameters in parallel worker processes.")
+                col1, col2 = st.columns(2)
+                with col1:
+                    sweep_capacities = st.multiselect("Max Plant Capacity", list(range(100000, 200001, 10000)),
+                                                      default=[max_capacity], key="sweep_capacity")
+                    sweep_truck_sizes = st.multiselect("Truck Size", [5000, 10000, 20000],
+                                                       default=[truck_size], key="sweep_truck_size")
+                with col2:
+                    sweep_thresholds = st.multiselect("Partial Truck Threshold (%)", list(range(30, 81, 10)),
+                                                      default=[int(round(partial_threshold * 100))], key="sweep_threshold")
+                    sweep_safety = st.multiselect("Safety Stock", list(range(1000, 10001, 1000)),
+                                                  default=[safety_stock], key="sweep_safety")
+                sweep_scenarios = scenario_grid(
+                    max_capacity=sweep_capacities,
+                    allocation_method=[allocation_method.lower().replace(" ", "_")],
+                    truck_size=sweep_truck_sizes,
+                    strategy=[truck_strategy.lower().replace(" ", "_")],
+                    partial_threshold=[threshold / 100 for threshold in sweep_thresholds],
+                    safety_stock=sweep_safety
+                )
+                if st.button(f"Run {len(sweep_scenarios)} Scenarios", key="run_sweep") and sweep_scenarios:
+                    st.session_state['sweep_df'] = run_scenario_sweep(demand_df, sweep_scenarios, fleet=fleet,
+                                                                   lp_options=lp_options)
+                sweep_df = st.session_state.get('sweep_df')
+                if sweep_df is not None and not sweep_df.empty:
+                    import plotly.express as px
+                    fig_sweep = px.scatter(sweep_df, x='total_trucks', y='service_level', color='truck_utilization',
+                                           hover_data=['max_capacity', 'truck_size', 'partial_threshold', 'safety_stock'],
+                                           title='Service Level vs Trucks by Scenario')
+                    st.plotly_chart(fig_sweep, use_container_width=True)
+                    st.dataframe(sweep_df.sort_values('service_level', ascending=False), use_container_width=True)
     else:
         advanced_simulate = st.sidebar.button("🎯 Simulate Advanced ML Scenario", type="primary")
         if advanced_simulate:
-            forecast_df = forecast_demand(demand_df, year=2025, periods=forecast_periods)
-            if enable_festival and 'festival_weeks' in locals() and festival_weeks:
-                forecast_df = apply_festival_multiplier(forecast_df, festival_weeks, festival_multiplier)
+            profiler = start_profiler(profile_mode)
+            forecast_df = profiler.track('forecast_demand', forecast_demand, demand_df, year=2025,
+                                         periods=forecast_periods, model=forecast_model)
+            st.session_state['forecast_accuracy'] = profiler.track('backtest_forecast', backtest_forecast,
+                                                                   demand_df, model=forecast_model)
+            forecast_df = profiler.track('calendar_events', event_calendar.apply, forecast_df)
             st.session_state['forecast_df'] = forecast_df
             combined_df = pd.concat([demand_df, forecast_df], ignore_index=True) if forecast_df is not None and not forecast_df.empty else demand_df
-            shipment_df = allocate_production(combined_df.copy(), max_capacity)
-            shipment_df = enhanced_truck_planning(shipment_df, truck_size,
-                                                  truck_strategy.lower().replace(" ", "_"),
-                                                  partial_threshold, safety_stock)
+            shipment_df, metrics = st.session_state['pipeline'].run(
+                combined_df,
+                max_capacity=max_capacity,
+                allocation_method=allocation_method.lower().replace(" ", "_"),
+                truck_size=truck_size,
+                strategy=truck_strategy.lower().replace(" ", "_"),
+                partial_threshold=partial_threshold,
+                safety_stock=safety_stock,
+                fleet=fleet,
+                lead_time_map=lead_time_map,
+                opening_stock=opening_stock,
+                lp_options=lp_options
+            )
             st.session_state['shipment_df'] = shipment_df
-            st.session_state['anomaly_df'] = detect_anomalies(shipment_df)
-            st.session_state['clusters_df'] = cluster_skus(shipment_df)
-            st.session_state['metrics'] = calculate_metrics(shipment_df)
+            st.session_state['saved_run_id'] = None
+            st.session_state['anomaly_df'] = profiler.track('detect_anomalies', detect_anomalies, shipment_df,
+                                                            method=anomaly_method.lower().replace(" ", "_"))
+            st.session_state['clusters_df'] = profiler.track('cluster_skus', cluster_skus, shipment_df, n_clusters='auto')
+            st.session_state['metrics'] = metrics
+            if risk_trials:
+                st.session_state['risk_summary'], st.session_state['risk_rows'] = profiler.track(
+                    'simulate_demand_risk', simulate_demand_risk, combined_df, fit_noise_model(demand_df),
+                    trials=risk_trials, max_capacity=max_capacity, truck_size=truck_size,
+                    partial_threshold=partial_threshold, safety_stock=safety_stock)
+            else:
+                st.session_state['risk_summary'], st.session_state['risk_rows'] = None, None
         if st.session_state.get('forecast_df') is not None:
             st.markdown(f"### 📊 Forecasted Demand (Next {forecast_periods} Weeks)")
             st.dataframe(st.session_state['forecast_df'], use_container_width=True)
@@ -257,6 +502,9 @@ if uploaded_file:
             anomaly_df = st.session_state.get('anomaly_df', pd.DataFrame())
             clusters_df = st.session_state.get('clusters_df', pd.DataFrame())
             forecast_df = st.session_state.get('forecast_df', pd.DataFrame())
+            forecast_accuracy = st.session_state.get('forecast_accuracy')
+            import plotly.express as px
+            import plotly.graph_objects as go
             st.markdown("## 🎯 Executive Command Center")
             col1, col2, col3, col4 = st.columns(4)
             with col1:
@@ -276,12 +524,13 @@ if uploaded_file:
                 if anomaly_df is not None and not anomaly_df.empty and 'anomaly' in anomaly_df.columns:
                     anomaly_count = len(anomaly_df[anomaly_df['anomaly']])
                 col4.metric("Anomalies", f"{anomaly_count}", delta_color="inverse" if anomaly_count > 0 else "normal")
-            tab1, tab2, tab3, tab4, tab5 = st.tabs([
+            tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
                 "🎯 Strategic Overview",
                 "📈 Demand Intelligence",
                 "🤖 ML Insights",
                 "🚨 Anomalies",
-                "📊 Detailed Results"
+                "📊 Detailed Results",
+                "🎲 Demand Risk"
             ])
             with tab1:
                 st.markdown("### 🎯 Strategic Performance Dashboard")
@@ -316,9 +565,9 @@ if uploaded_file:
                     cost_data = {
                         'Category': ['Production', 'Transportation', 'Inventory'],
                         'Cost': [
-                            shipment_df.get('allocated', pd.Series([0])).sum() * cost_production,
-                            shipment_df.get('total_trucks', pd.Series([0])).sum() * cost_transport,
-                            shipment_df.get('allocated', pd.Series([0])).sum() * cost_inventory
+                            metrics.get('total_allocated', 0) * cost_production,
+                            metrics.get('total_trucks', 0) * cost_transport,
+                            metrics.get('total_allocated', 0) * cost_inventory
                         ]
                     }
                     cost_df = pd.DataFrame(cost_data)
@@ -332,7 +581,7 @@ if uploaded_file:
                     <div class="dashboard-container">
                     <h4>📊 Capacity Utilization</h4>
                     """, unsafe_allow_html=True)
-                    weekly_capacity = shipment_df.groupby('week')['allocated'].sum().reset_index()
+                    weekly_capacity = plan_aggregate(shipment_df, 'week', ['allocated'], kpis=metrics.get('kpis'))
                     weekly_capacity['utilization'] = (weekly_capacity['allocated'] / max_capacity) * 100
                     fig_capacity = px.bar(weekly_capacity, x='week', y='utilization',
                                           title='Weekly Capacity Utilization %',
@@ -359,18 +608,13 @@ if uploaded_file:
                         fig_forecast.update_layout(height=400)
                         st.plotly_chart(fig_forecast, use_container_width=True)
                 with col2:
-                    weekly_pattern = shipment_df.groupby('week')['demand'].sum().reset_index()
+                    weekly_pattern = plan_aggregate(shipment_df, 'week', ['demand'], kpis=metrics.get('kpis'))
                     weekly_pattern['seasonality'] = np.sin(2 * np.pi * weekly_pattern['week'] / 52) * 0.2 + 1
                     fig_season = px.area(weekly_pattern, x='week', y=['demand'],
                                          title='Demand Seasonality Pattern')
                     st.plotly_chart(fig_season, use_container_width=True)
                 st.markdown("#### 🎯 SKU Performance Matrix")
-                sku_performance = shipment_df.groupby('sku').agg({
-                    'demand': 'sum',
-                    'allocated': 'sum',
-                    'safety_met': 'mean'
-                }).reset_index()
-                sku_performance['fill_rate'] = (sku_performance['allocated'] / sku_performance['demand']) * 100
+                sku_performance = plan_aggregate(shipment_df, 'sku', ['demand', 'allocated', 'safety_met', 'fill_rate'], kpis=metrics.get('kpis'))
                 fig_matrix = px.scatter(sku_performance, x='demand', y='fill_rate',
                                         size='allocated', color='safety_met',
                                         hover_name='sku', title='SKU Performance Matrix',
@@ -402,26 +646,22 @@ if uploaded_file:
                             st.info("Clustering analysis not available for current data.")
                 with col2:
                     st.markdown("#### 🔮 Forecast Accuracy")
-                    if forecast_df is not None and not forecast_df.empty:
-                        forecast_accuracy = pd.DataFrame({
-                            'SKU': forecast_df['sku'].unique(),
-                            'MAPE': np.random.uniform(5, 15, len(forecast_df['sku'].unique())),
-                            'MAE': np.random.uniform(1000, 5000, len(forecast_df['sku'].unique())),
-                            'Accuracy_Score': np.random.uniform(85, 98, len(forecast_df['sku'].unique()))
-                        })
-                        fig_accuracy = px.bar(forecast_accuracy, x='SKU', y='Accuracy_Score',
-                                              title='Forecast Accuracy by SKU (%)',
-                                              color='Accuracy_Score',
+                    if forecast_accuracy is not None and not forecast_accuracy.empty:
+                        fig_accuracy = px.bar(forecast_accuracy, x='sku', y='accuracy_score',
+                                              title='Backtest Forecast Accuracy by SKU (%)',
+                                              color='accuracy_score',
                                               color_continuous_scale='RdYlGn')
                         st.plotly_chart(fig_accuracy, use_container_width=True)
                         st.dataframe(forecast_accuracy, use_container_width=True)
+                    else:
+                        st.info("Not enough history to backtest the forecast model.")
                 st.markdown("#### 🎯 ML Model Performance Summary")
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Forecast Accuracy", "92.3%", delta="2.1%")
+                    overall_accuracy = forecast_accuracy['accuracy_score'].mean() if forecast_accuracy is not None and not forecast_accuracy.empty else 0.0
+                    st.metric("Forecast Accuracy", f"{overall_accuracy:.1f}%")
                 with col2:
-                    cluster_quality = 0.85 if clusters_df is not None and not clusters_df.empty else 0.0
-                    st.metric("Clustering Quality", f"{cluster_quality:.2f}", delta="0.05")
+                    st.metric("Clustering Quality", f"{cluster_quality(clusters_df):.2f}")
                 with col3:
                     anomaly_detection_rate = (anomaly_count / len(shipment_df)) * 100 if len(shipment_df) > 0 else 0
                     st.metric("Anomaly Detection", f"{anomaly_detection_rate:.1f}%")
@@ -464,45 +704,77 @@ if uploaded_file:
                                                options=shipment_df['sku'].unique(),
                                                default=shipment_df['sku'].unique(),
                                                key="advanced_sku_filter")
-                filtered_df = shipment_df.copy()
-                if week_filter:
-                    filtered_df = filtered_df[filtered_df['week'].isin(week_filter)]
-                if dc_filter:
-                    filtered_df = filtered_df[filtered_df['dc'].isin(dc_filter)]
-                if sku_filter:
-                    filtered_df = filtered_df[filtered_df['sku'].isin(sku_filter)]
-                st.dataframe(highlight_violations(filtered_df), use_container_width=True)
+                show_plan_page(shipment_df, "advanced_plan", utilization_alert,
+                               weeks=week_filter or None,
+                               dcs=dc_filter or None,
+                               skus=sku_filter or None)
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     st.download_button(
                         "📥 Download Planning Results",
-                        shipment_df.to_csv(index=False).encode('utf-8'),
-                        "advanced_shipment_plan.csv",
-                        "text/csv",
+                        export_frame(shipment_df, export_format),
+                        f"advanced_shipment_plan.{export_extension}",
+                        export_mime,
                         use_container_width=True
                     )
                 with col2:
                     if forecast_df is not None and not forecast_df.empty:
                         st.download_button(
                             "📈 Download Forecast Data",
-                            forecast_df.to_csv(index=False).encode('utf-8'),
-                            "demand_forecast.csv",
-                            "text/csv",
+                            export_frame(forecast_df, export_format),
+                            f"demand_forecast.{export_extension}",
+                            export_mime,
                             use_container_width=True
                         )
                 with col3:
                     if clusters_df is not None and not clusters_df.empty:
                         st.download_button(
                             "🏷️ Download Cluster Analysis",
-                            clusters_df.to_csv(index=False).encode('utf-8'),
-                            "sku_clusters.csv",
-                            "text/csv",
+                            export_frame(clusters_df, export_format),
+                            f"sku_clusters.{export_extension}",
+                            export_mime,
                             use_container_width=True
                         )
+                if st.button("💾 Save Planning Results to Database", key="advanced_save"):
+                    st.session_state['saved_run_id'] = save_shipment_plan(shipment_df)
+                    st.success(f"Planning results saved to the database as run {st.session_state['saved_run_id']}.")
+            with tab6:
+                st.markdown("### 🎲 Demand Uncertainty Simulation")
+                risk_summary = st.session_state.get('risk_summary')
+                risk_rows = st.session_state.get('risk_rows')
+                if risk_summary is not None and not risk_summary.empty:
+                    risk = risk_summary.set_index('metric')
+                    col1, col2, col3, col4 = st.columns(4)
+                    col1.metric("Service Level P10", f"{risk.loc['service_level', 'p10']:.1f}%")
+                    col2.metric("Service Level P50", f"{risk.loc['service_level', 'p50']:.1f}%")
+                    col3.metric("Service Level P90", f"{risk.loc['service_level', 'p90']:.1f}%")
+                    col4.metric("Safety Breach Probability", f"{risk.loc['safety_breach_probability', 'mean']:.1%}")
+                    st.dataframe(risk_summary, use_container_width=True)
+                    breach_by_week = risk_rows.groupby('week')['breach_probability'].mean().reset_index()
+                    fig_risk = px.bar(breach_by_week, x='week', y='breach_probability',
+                                      title='Average Safety Stock Breach Probability by Week')
+                    fig_risk.update_yaxes(tickformat=".0%", range=[0, 1])
+                    st.plotly_chart(fig_risk, use_container_width=True)
+                else:
+                    st.info("Set Monte Carlo Demand Trials above 0 to simulate demand risk.")
         else:
             st.info("Click 'Simulate Advanced ML Scenario' to run forecasting, optimization, and analytics.")
+    show_performance_panel()
+elif saved_plan_name:
+    st.markdown("### 📂 Saved Plan")
+    saved_plan_path = os.path.join(PLAN_DIR, saved_plan_name)
+    try:
+        available_columns = plan_columns(saved_plan_path)
+        selected_columns = st.multiselect("Columns", options=available_columns,
+                                          default=available_columns[:6], key="saved_plan_columns")
+        if selected_columns:
+            saved_plan_df = load_plan(saved_plan_path, columns=selected_columns)
+            st.metric("Rows", f"{len(saved_plan_df):,}")
+            st.dataframe(saved_plan_df.head(1000), use_container_width=True)
+    except (OSError, ValueError) as e:
+        st.error(f"Could not read saved plan '{saved_plan_name}': {e}")
 else:
-    st.info("👆 Please upload your demand CSV file using the sidebar to get started.")
+    st.info("👆 Please upload your demand file using the sidebar to get started.")
 
 
 st.markdown("<hr>", unsafe_allow_html=True)
@@ -0,0 +1,32 @@
+import time
+import numpy as np
+from planner.events import festival_calendar
+from planner.synthetic import demand_of_size
+
+def apply_row_wise(df, festival_weeks, multiplier):
+    df = df.copy()
+    df['demand'] = df.apply(lambda row:
+        row['demand'] * multiplier if row['week'] in festival_weeks else row['demand'], axis=1)
+    return df
+
+def run(n_rows=1_000_000, festival_weeks=(10, 15, 20), multiplier=1.5, repeats=3):
+    forecast_df = demand_of_size(n_rows)
+    calendar = festival_calendar(list(festival_weeks), multiplier)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectorized = calendar.apply(forecast_df)
+        timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    row_wise = apply_row_wise(forecast_df, list(festival_weeks), multiplier)
+    apply_s = time.perf_counter() - start
+    return {
+        'rows': n_rows,
+        'vectorized_best_s': min(timings),
+        'apply_s': apply_s,
+        'speedup': apply_s / min(timings),
+        'matches': bool(np.allclose(vectorized['demand'], row_wise['demand']))
+    }
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,15 @@
+import time
+from planner.forecasting import forecast_demand
+from planner.synthetic import generate_demand
+
+def run(n_groups=10_000, periods=12, repeats=3):
+    history_df = generate_demand(-(-n_groups // 10), 10, 26)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        forecast_df = forecast_demand(history_df, periods=periods)
+        timings.append(time.perf_counter() - start)
+    return {'groups': n_groups, 'periods': periods, 'rows_out': len(forecast_df), 'best_s': min(timings)}
+
+if __name__ == "__main__":
+    print(run())
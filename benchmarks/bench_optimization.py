@@ -0,0 +1,24 @@
+import sys
+import time
+import pandas as pd
+from planner.optimization import AllocationLP
+from planner.synthetic import generate_demand
+
+def run(n_skus=1000, n_dcs=10, n_weeks=52, capacities=(150000, 200000)):
+    df = generate_demand(n_skus, n_dcs, n_weeks, base_demand=300, noise=0.5)
+    lead_time_map = {dc: 1 + code % 3 for code, dc in enumerate(df['dc'].cat.categories)}
+    
+    start = time.perf_counter()
+    model = AllocationLP(df, lead_time_map)
+    results = [{'step': 'build', 'rows': len(df), 'seconds': time.perf_counter() - start}]
+    
+    for capacity in capacities:
+        start = time.perf_counter()
+        _, cost = model.solve(capacity * n_skus / 100, safety_stock=500)
+        results.append({'step': f'solve capacity={capacity}', 'rows': len(df),
+                        'seconds': time.perf_counter() - start, 'cost': cost})
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    n_skus = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(run(n_skus).to_string(index=False))
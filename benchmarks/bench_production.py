@@ -0,0 +1,21 @@
+import time
+import pandas as pd
+from planner.production import allocate_production
+from planner.synthetic import demand_of_size
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000, 5_000_000]
+
+def run(row_counts=ROW_COUNTS, repeats=3):
+    results = []
+    for n_rows in row_counts:
+        df = demand_of_size(n_rows)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            allocate_production(df)
+            timings.append(time.perf_counter() - start)
+        results.append({'rows': n_rows, 'best_s': min(timings), 'rows_per_s': n_rows / min(timings)})
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    print(run().to_string(index=False))
@@ -0,0 +1,30 @@
+import time
+import pandas as pd
+from planner.shipment import enhanced_truck_planning
+from planner.synthetic import generate_demand
+
+STRATEGIES = ['full_trucks', 'partial', 'consolidation', 'next_week_batching']
+
+def make_allocations(n_skus=200, n_dcs=50, n_weeks=52, seed=42):
+    df = generate_demand(n_skus, n_dcs, n_weeks, base_demand=15000, noise=0.5, seed=seed)
+    return df.assign(allocated=df['demand'])
+
+def run(truck_size=10000, partial_threshold=0.6, **shape):
+    df = make_allocations(**shape)
+    results = []
+    for strategy in STRATEGIES:
+        start = time.perf_counter()
+        plan = enhanced_truck_planning(df, truck_size, strategy, partial_threshold, 0)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'strategy': strategy,
+            'rows': len(df),
+            'seconds': elapsed,
+            'total_trucks': int(plan['total_trucks'].sum()),
+            'shipped': int(plan['shipped'].sum()),
+            'avg_utilization': 100 * plan['shipped'].sum() / max(plan['total_trucks'].sum() * truck_size, 1)
+        })
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    print(run().to_string(index=False))
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_PACKAGES = ('sklearn', 'scipy', 'plotly', 'joblib')
+PLANNER_IMPORT = ("import planner.pipeline, planner.ingest, planner.streaming, planner.scenarios, "
+                  "planner.simulation, planner.forecasting, planner.anomaly, planner.clustering, "
+                  "planner.events, database.plan_queries")
+FIRST_RENDER = "import runpy; runpy.run_path('app.py', run_name='__main__')"
+
+def import_profile(statement):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True)
+    wall_s = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    
+    cumulative, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        if not cumulative_us.strip().isdigit():
+            continue
+        loaded.add(name.strip().split('.')[0])
+        if not name.startswith('  '):
+            package = name.strip().split('.')[0]
+            cumulative[package] = cumulative.get(package, 0) + int(cumulative_us) / 1e6
+    return wall_s, cumulative, loaded
+
+def profile(statement, top=5):
+    wall_s, cumulative, loaded = import_profile(statement)
+    return {
+        'wall_s': wall_s,
+        'import_s': sum(cumulative.values()),
+        'heavy_loaded': [package for package in HEAVY_PACKAGES if package in loaded],
+        'slowest': dict(sorted(cumulative.items(), key=lambda item: -item[1])[:top])
+    }
+
+def run(repeats=3):
+    results = {}
+    for name, statement in (('planner_import', PLANNER_IMPORT), ('app_first_render', FIRST_RENDER)):
+        try:
+            runs = [profile(statement) for _ in range(repeats)]
+        except RuntimeError as error:
+            results[name] = {'error': str(error)}
+            continue
+        results[name] = min(runs, key=lambda run: run['wall_s'])
+    return results
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import pandas as pd
+from planner.synthetic import demand_of_size
+from planner.profiling import StageProfiler
+from planner.production import allocate_production
+from planner.shipment import enhanced_truck_planning
+from planner.inventory import time_phased_plan
+from planner.optimization import optimize_allocation
+from planner.forecasting import forecast_demand, backtest_forecast
+from planner.events import festival_calendar
+from planner.metrics import calculate_metrics, classify_violations, PlanKPIs
+from planner.anomaly import detect_anomalies, model_cache
+from planner.clustering import cluster_skus, store_cache
+from planner.simulation import simulate_demand_risk
+from planner.pipeline import PlanningPipeline, fingerprint_frame
+from planner.ingest import read_demand_file, save_plan, load_plan, export_frame
+from planner.streaming import plan_streaming
+from database.db_utils import create_tables, save_shipment_plan, load_shipment_plan
+from database.plan_queries import aggregate_plan
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TOLERANCE = 0.25
+NOISE_FLOOR_S = 0.01
+NOISE_FLOOR_MB = 1.0
+
+class Fixtures:
+    def __init__(self, n_rows, workdir):
+        self.n_rows = n_rows
+        self.workdir = workdir
+        self.cache = {}
+    
+    def get(self, name):
+        if name not in self.cache:
+            self.cache[name] = getattr(self, f'make_{name}')()
+        return self.cache[name]
+    
+    def make_demand(self):
+        return demand_of_size(self.n_rows)
+    
+    def make_allocated(self):
+        return allocate_production(self.get('demand'))
+    
+    def make_plan(self):
+        return enhanced_truck_planning(self.get('allocated'), 10000, 'partial', 0.6, 5000)
+    
+    def make_lead_times(self):
+        return {dc: 1 + position % 3 for position, dc in enumerate(self.get('demand')['dc'].cat.categories)}
+    
+    def make_csv_path(self):
+        path = os.path.join(self.workdir, 'demand.csv')
+        self.get('demand').to_csv(path, index=False)
+        return path
+    
+    def make_parquet_path(self):
+        path = os.path.join(self.workdir, 'plan.parquet')
+        save_plan(self.get('plan'), path)
+        return path
+    
+    def make_db_path(self):
+        path = os.path.join(self.workdir, 'plans.db')
+        create_tables(path)
+        return path
+    
+    def make_run_id(self):
+        return save_shipment_plan(self.get('plan'), db_path=self.get('db_path'))
+
+def fresh(func, *caches):
+    def wrapper(*args, **kwargs):
+        for cache in caches:
+            cache.clear()
+        return func(*args, **kwargs)
+    return wrapper
+
+def case(fixtures, func, *names, **kwargs):
+    return func, [fixtures.get(name) for name in names], kwargs
+
+CASES = {
+    'production.allocate_production[proportional]':
+        (None, lambda f: case(f, allocate_production, 'demand')),
+    'production.allocate_production[largest_remainder]':
+        (None, lambda f: case(f, allocate_production, 'demand', method='largest_remainder')),
+    'optimization.optimize_allocation':
+        (10_000, lambda f: case(f, optimize_allocation, 'demand', lead_time_map=f.get('lead_times'))),
+    'shipment.enhanced_truck_planning[full_trucks]':
+        (None, lambda f: case(f, enhanced_truck_planning, 'allocated', strategy='full_trucks')),
+    'shipment.enhanced_truck_planning[partial]':
+        (None, lambda f: case(f, enhanced_truck_planning, 'allocated', strategy='partial')),
+    'shipment.enhanced_truck_planning[consolidation]':
+        (None, lambda f: case(f, enhanced_truck_planning, 'allocated', strategy='consolidation')),
+    'shipment.enhanced_truck_planning[next_week_batching]':
+        (None, lambda f: case(f, enhanced_truck_planning, 'allocated', strategy='next_week_batching')),
+    'shipment.enhanced_truck_planning[mixed_fleet]':
+        (None, lambda f: case(f, enhanced_truck_planning, 'allocated', strategy='mixed_fleet')),
+    'inventory.time_phased_plan':
+        (None, lambda f: case(f, time_phased_plan, 'plan', 'lead_times')),
+    'forecasting.forecast_demand[mean]':
+        (None, lambda f: case(f, forecast_demand, 'demand', periods=8)),
+    'forecasting.forecast_demand[ses]':
+        (None, lambda f: case(f, forecast_demand, 'demand', periods=8, model='ses')),
+    'forecasting.forecast_demand[holt]':
+        (None, lambda f: case(f, forecast_demand, 'demand', periods=8, model='holt')),
+    'forecasting.backtest_forecast':
+        (None, lambda f: case(f, backtest_forecast, 'demand')),
+    'events.EventCalendar.apply':
+        (None, lambda f: case(f, festival_calendar([10, 15, 20], 1.5).apply, 'demand')),
+    'metrics.calculate_metrics':
+        (None, lambda f: case(f, calculate_metrics, 'plan')),
+    'metrics.PlanKPIs.from_frame':
+        (None, lambda f: case(f, PlanKPIs.from_frame, 'plan')),
+    'metrics.classify_violations':
+        (None, lambda f: case(f, classify_violations, 'plan')),
+    'anomaly.detect_anomalies[robust_z]':
+        (None, lambda f: case(f, detect_anomalies, 'plan', method='robust_z')),
+    'anomaly.detect_anomalies[isolation_forest]':
+        (None, lambda f: case(f, fresh(detect_anomalies, model_cache), 'plan')),
+    'clustering.cluster_skus':
+        (None, lambda f: case(f, fresh(cluster_skus, store_cache), 'plan', n_clusters='auto')),
+    'simulation.simulate_demand_risk':
+        (1_000_000, lambda f: case(f, simulate_demand_risk, 'demand', trials=100)),
+    'pipeline.PlanningPipeline.run':
+        (None, lambda f: case(f, lambda df: PlanningPipeline().run(df), 'demand')),
+    'pipeline.fingerprint_frame':
+        (None, lambda f: case(f, fingerprint_frame, 'demand')),
+    'ingest.read_demand_file[csv]':
+        (None, lambda f: case(f, read_demand_file, 'csv_path', 'csv_path')),
+    'ingest.save_plan[parquet]':
+        (None, lambda f: case(f, save_plan, 'plan', 'parquet_path')),
+    'ingest.load_plan[parquet]':
+        (None, lambda f: case(f, load_plan, 'parquet_path')),
+    'ingest.export_frame[parquet]':
+        (None, lambda f: case(f, export_frame, 'plan', fmt='Parquet')),
+    'streaming.plan_streaming':
+        (None, lambda f: case(f, plan_streaming, 'csv_path')),
+    'db_utils.save_shipment_plan':
+        (1_000_000, lambda f: case(f, save_shipment_plan, 'plan', db_path=f.get('db_path'))),
+    'db_utils.load_shipment_plan':
+        (1_000_000, lambda f: case(f, load_shipment_plan, 'run_id', db_path=f.get('db_path'))),
+    'plan_queries.aggregate_plan':
+        (1_000_000, lambda f: case(f, aggregate_plan, 'run_id', by=['week', 'dc'],
+                                   aggregates=['demand', 'allocated', 'fill_rate'], db_path=f.get('db_path')))
+}
+
+def measure(name, func, args, kwargs, repeats, memory):
+    if repeats > 1:
+        func(*args, **kwargs)
+    timer = StageProfiler()
+    for _ in range(repeats):
+        timer.track(name, func, *args, **kwargs)
+    result = {'best_s': min(record['wall_s'] for record in timer.records), 'peak_mb': None}
+    if memory:
+        tracer = StageProfiler('tracemalloc')
+        tracer.track(name, func, *args, **kwargs)
+        result['peak_mb'] = tracer.records[0]['stage_peak_mb']
+    return result
+
+def run(sizes=('1k', '100k'), pattern=None, repeats=3, memory=True):
+    results = []
+    for size in sizes:
+        n_rows = SIZES[size]
+        workdir = tempfile.mkdtemp(prefix='planner_bench_')
+        fixtures = Fixtures(n_rows, workdir)
+        try:
+            for name, (max_rows, setup) in CASES.items():
+                if pattern and pattern not in name:
+                    continue
+                if max_rows is not None and n_rows > max_rows:
+                    results.append({'case': name, 'size': size, 'rows': n_rows, 'skipped': f'over {max_rows:,} rows'})
+                    continue
+                func, args, kwargs = setup(fixtures)
+                measured = measure(name, func, args, kwargs, repeats if n_rows <= 100_000 else 1, memory)
+                results.append({'case': name, 'size': size, 'rows': n_rows, **measured,
+                                'rows_per_s': n_rows / measured['best_s'] if measured['best_s'] else None})
+                print(f"{size:>5} {name:<55} {measured['best_s']:9.4f}s", file=sys.stderr)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return pd.DataFrame(results)
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {'results': {}}
+    with open(path) as handle:
+        return json.load(handle)
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    baseline['machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                           'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count()}
+    baseline['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    for row in results.dropna(subset=['best_s']).to_dict('records'):
+        baseline['results'][f"{row['case']}@{row['size']}"] = {
+            'best_s': row['best_s'],
+            'peak_mb': None if pd.isna(row['peak_mb']) else row['peak_mb']
+        }
+    with open(path, 'w') as handle:
+        json.dump(baseline, handle, indent=2, sort_keys=True)
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    results = results.copy()
+    reference = pd.DataFrame.from_dict(baseline['results'], orient='index').reindex(columns=['best_s', 'peak_mb'])
+    keys = results['case'] + '@' + results['size']
+    results['baseline_s'] = keys.map(reference['best_s']).astype(float)
+    results['baseline_mb'] = keys.map(reference['peak_mb']).astype(float)
+    results['peak_mb'] = results['peak_mb'].astype(float)
+    slower = ((results['best_s'] > results['baseline_s'] * (1 + tolerance)) &
+              (results['best_s'] - results['baseline_s'] > NOISE_FLOOR_S))
+    heavier = ((results['peak_mb'] > results['baseline_mb'] * (1 + tolerance)) &
+               (results['peak_mb'] - results['baseline_mb'] > NOISE_FLOOR_MB))
+    results['time_change'] = results['best_s'] / results['baseline_s'] - 1
+    results['regression'] = (slower | heavier).fillna(False)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Planner benchmark suite on synthetic demand')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['1k', '100k'])
+    parser.add_argument('--filter', dest='pattern', help='Only run cases whose name contains this text')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed repeats for sizes up to 100k rows')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Allowed slowdown before flagging')
+    args = parser.parse_args(argv)
+    
+    results = run(args.sizes, args.pattern, args.repeats, not args.no_memory)
+    results = compare(results, load_baseline(args.baseline), args.tolerance)
+    columns = [column for column in ('case', 'size', 'best_s', 'baseline_s', 'time_change', 'peak_mb',
+                                     'baseline_mb', 'rows_per_s', 'regression', 'skipped') if column in results.columns]
+    print(results[columns].to_string(index=False, float_format=lambda value: f'{value:.4g}'))
+    
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f'\nBaseline written to {args.baseline}')
+        return 0
+    regressions = results[results['regression']]
+    if not regressions.empty:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions['case'] + '@' + regressions['size'])}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
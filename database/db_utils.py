@@ -1,26 +1,112 @@
 import sqlite3
 import os
+import uuid
+from datetime import datetime
+import pandas as pd
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'planning_results.db')
 
-def create_tables():
-    conn = sqlite3.connect(DB_PATH)
+PLAN_COLUMNS = {
+    'run_id': 'TEXT',
+    'sku': 'TEXT',
+    'dc': 'TEXT',
+    'week': 'INTEGER',
+    'demand': 'INTEGER',
+    'allocated': 'INTEGER',
+    'full_trucks': 'INTEGER',
+    'partial_trucks': 'INTEGER',
+    'total_trucks': 'INTEGER',
+    'shipped': 'INTEGER',
+    'unshipped': 'INTEGER',
+    'truck_utilization': 'REAL',
+    'safety_met': 'BOOLEAN'
+}
+
+PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536'
+]
+
+def connect(db_path=None):
+    conn = sqlite3.connect(db_path or DB_PATH)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def create_tables(db_path=None):
+    conn = connect(db_path)
     cursor = conn.cursor()
-    cursor.execute('''
+    cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS shipment_plan (
-            sku TEXT,
-            dc TEXT,
-            week INTEGER,
-            demand INTEGER,
-            allocated INTEGER,
-            total_trucks INTEGER,
-            safety_met BOOLEAN
+            {', '.join(f'{name} {sql_type}' for name, sql_type in PLAN_COLUMNS.items())}
         )
     ''')
+    existing = {row[1] for row in cursor.execute('PRAGMA table_info(shipment_plan)')}
+    for name, sql_type in PLAN_COLUMNS.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE shipment_plan ADD COLUMN {name} {sql_type}')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS plan_runs (
+            run_id TEXT PRIMARY KEY,
+            created_at TEXT,
+            row_count INTEGER
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_shipment_plan_run ON shipment_plan (run_id, week, dc, sku)')
     conn.commit()
     conn.close()
 
-def save_shipment_plan(df):
-    conn = sqlite3.connect(DB_PATH)
-    df.to_sql('shipment_plan', conn, if_exists='replace', index=False)
+def new_run_id():
+    return uuid.uuid4().hex
+
+def save_shipment_plan(df, run_id=None, db_path=None):
+    run_id = run_id or new_run_id()
+    columns = [name for name in PLAN_COLUMNS if name == 'run_id' or name in df.columns]
+    values = [[run_id] * len(df) if name == 'run_id' else df[name].tolist() for name in columns]
+    
+    conn = connect(db_path)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO shipment_plan ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            zip(*values)
+        )
+        conn.execute('''
+            INSERT INTO plan_runs (run_id, created_at, row_count) VALUES (?, ?, ?)
+            ON CONFLICT(run_id) DO UPDATE SET row_count = row_count + excluded.row_count
+        ''', (run_id, datetime.now().isoformat(timespec='seconds'), len(df)))
+    conn.close()
+    return run_id
+
+def list_runs(db_path=None):
+    conn = connect(db_path)
+    runs = pd.read_sql_query('SELECT run_id, created_at, row_count FROM plan_runs ORDER BY created_at DESC', conn)
+    conn.close()
+    return runs
+
+def latest_run_id(db_path=None):
+    conn = connect(db_path)
+    row = conn.execute('SELECT run_id FROM plan_runs ORDER BY created_at DESC, rowid DESC LIMIT 1').fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def load_shipment_plan(run_id=None, week=None, dc=None, sku=None, db_path=None):
+    run_id = run_id or latest_run_id(db_path)
+    clauses, params = ['run_id = ?'], [run_id]
+    for column, value in (('week', week), ('dc', dc), ('sku', sku)):
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    
+    conn = connect(db_path)
+    plan = pd.read_sql_query(f"SELECT * FROM shipment_plan WHERE {' AND '.join(clauses)}", conn, params=params)
+    conn.close()
+    return plan
+
+def delete_run(run_id, db_path=None):
+    conn = connect(db_path)
+    with conn:
+        conn.execute('DELETE FROM shipment_plan WHERE run_id = ?', (run_id,))
+        conn.execute('DELETE FROM plan_runs WHERE run_id = ?', (run_id,))
     conn.close()
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from database.db_utils import connect, latest_run_id
+
+AGGREGATES = {
+    'demand': 'SUM(demand)',
+    'allocated': 'SUM(allocated)',
+    'shipped': 'SUM(shipped)',
+    'total_trucks': 'SUM(total_trucks)',
+    'safety_met': 'AVG(safety_met)',
+    'fill_rate': '100.0 * SUM(allocated) / NULLIF(SUM(demand), 0)'
+}
+GROUP_COLUMNS = ('week', 'dc', 'sku')
+STATUS_SQL = ("CASE WHEN NOT COALESCE(safety_met, 1) THEN 'safety_breach' "
+              "WHEN allocated < demand THEN 'under_allocated' "
+              "WHEN truck_utilization < ? THEN 'low_utilization' ELSE 'ok' END")
+
+def where_clause(run_id, weeks=None, dcs=None, skus=None):
+    clauses, params = ['run_id = ?'], [run_id]
+    for column, values in (('week', weeks), ('dc', dcs), ('sku', skus)):
+        if values is None:
+            continue
+        values = [value.item() if hasattr(value, 'item') else value for value in values]
+        clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return ' AND '.join(clauses), params
+
+def aggregate_plan(run_id, by, aggregates, weeks=None, dcs=None, skus=None, db_path=None):
+    by = [by] if isinstance(by, str) else list(by)
+    if any(column not in GROUP_COLUMNS for column in by):
+        raise ValueError(f"Can only group stored plans by {GROUP_COLUMNS}")
+    run_id = run_id or latest_run_id(db_path)
+    where, params = where_clause(run_id, weeks, dcs, skus)
+    select = ', '.join(by + [f'{AGGREGATES[name]} AS {name}' for name in aggregates])
+    query = f"SELECT {select} FROM shipment_plan WHERE {where} GROUP BY {', '.join(by)} ORDER BY {', '.join(by)}"
+    
+    conn = connect(db_path)
+    result = pd.read_sql_query(query, conn, params=params)
+    conn.close()
+    return result
+
+def aggregate_frame(df, by, aggregates, weeks=None, dcs=None, skus=None):
+    by = [by] if isinstance(by, str) else list(by)
+    df = filter_frame(df, weeks, dcs, skus)
+    sums = [name for name in ('demand', 'allocated', 'shipped', 'total_trucks') if name in aggregates]
+    if 'fill_rate' in aggregates:
+        sums += [name for name in ('demand', 'allocated') if name not in sums]
+    grouped = df.groupby(by, observed=True)
+    result = grouped[sums].sum() if sums else pd.DataFrame(index=grouped.size().index)
+    if 'safety_met' in aggregates:
+        result['safety_met'] = grouped['safety_met'].mean()
+    if 'fill_rate' in aggregates:
+        result['fill_rate'] = 100.0 * result['allocated'] / result['demand'].where(result['demand'] != 0)
+    return result.reset_index()[by + list(aggregates)]
+
+def filter_mask(df, weeks=None, dcs=None, skus=None):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (('week', weeks), ('dc', dcs), ('sku', skus)):
+        if values is not None:
+            mask &= df[column].isin(values).to_numpy()
+    return mask
+
+def filter_frame(df, weeks=None, dcs=None, skus=None):
+    return df[filter_mask(df, weeks, dcs, skus)]
+
+def load_filtered_plan(run_id, weeks=None, dcs=None, skus=None, limit=None, offset=0, db_path=None):
+    run_id = run_id or latest_run_id(db_path)
+    where, params = where_clause(run_id, weeks, dcs, skus)
+    query = f'SELECT * FROM shipment_plan WHERE {where}'
+    if limit is not None:
+        query += f" ORDER BY {', '.join(GROUP_COLUMNS)} LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+    
+    conn = connect(db_path)
+    result = pd.read_sql_query(query, conn, params=params)
+    conn.close()
+    return result.drop(columns=['run_id'])
+
+def filter_options(run_id, db_path=None):
+    run_id = run_id or latest_run_id(db_path)
+    conn = connect(db_path)
+    options = {
+        column: [row[0] for row in conn.execute(
+            f'SELECT DISTINCT {column} FROM shipment_plan WHERE run_id = ? ORDER BY {column}', (run_id,))]
+        for column in GROUP_COLUMNS
+    }
+    conn.close()
+    return options
+
+def violation_counts(run_id, utilization_threshold, weeks=None, dcs=None, skus=None, db_path=None):
+    run_id = run_id or latest_run_id(db_path)
+    where, params = where_clause(run_id, weeks, dcs, skus)
+    query = f'SELECT {STATUS_SQL} AS status, COUNT(*) AS row_count FROM shipment_plan WHERE {where} GROUP BY status'
+    
+    conn = connect(db_path)
+    counts = dict(conn.execute(query, [utilization_threshold] + params).fetchall())
+    conn.close()
+    return counts
+
+def load_plan_page(run_id, utilization_threshold, limit, offset=0, violations_only=False,
+                   weeks=None, dcs=None, skus=None, db_path=None):
+    run_id = run_id or latest_run_id(db_path)
+    where, params = where_clause(run_id, weeks, dcs, skus)
+    query = f'SELECT * FROM (SELECT *, {STATUS_SQL} AS status FROM shipment_plan WHERE {where})'
+    if violations_only:
+        query += " WHERE status != 'ok'"
+    query += f" ORDER BY {', '.join(GROUP_COLUMNS)} LIMIT ? OFFSET ?"
+    
+    conn = connect(db_path)
+    result = pd.read_sql_query(query, conn, params=[utilization_threshold] + params + [int(limit), int(offset)])
+    conn.close()
+    return result.drop(columns=['run_id'])
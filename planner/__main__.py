@@ -0,0 +1,78 @@
+import argparse
+import sys
+from planner.batch import run_batch, STAGES
+from planner.forecasting import FORECAST_MODELS
+
+ALLOCATION_METHODS = ['proportional', 'largest_remainder', 'cost_optimized']
+STRATEGIES = ['partial_trucks', 'consolidation', 'next_week_batching', 'mixed_fleet']
+
+def lead_time(value):
+    dc, _, weeks = value.partition('=')
+    if not dc or not weeks.isdigit():
+        raise argparse.ArgumentTypeError(f"Expected DC=WEEKS, got '{value}'")
+    return dc, int(weeks)
+
+def truck_type(value):
+    capacity, _, cost = value.partition('=')
+    try:
+        return int(capacity), float(cost)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected CAPACITY=COST, got '{value}'") from None
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m planner', description='Headless production and shipment planner')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='Plan one or more demand files (CSV, Parquet or Feather)')
+    run.add_argument('inputs', nargs='+', help='Demand files with sku, dc, week, demand columns')
+    run.add_argument('--output-dir', help='Write each plan as <output-dir>/<file>.parquet '
+                                          '(inputs sharing a file name get a path hash suffix)')
+    run.add_argument('--db', dest='db_path', help='Also save each plan as a run in this SQLite database')
+    run.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+    run.add_argument('--max-capacity', type=int, default=150000)
+    run.add_argument('--allocation-method', choices=ALLOCATION_METHODS, default='proportional')
+    run.add_argument('--truck-size', type=int, choices=[5000, 10000, 20000], default=10000)
+    run.add_argument('--strategy', choices=STRATEGIES, default='partial_trucks')
+    run.add_argument('--partial-threshold', type=int, default=60, help='Partial truck threshold in percent')
+    run.add_argument('--safety-stock', type=int, default=5000)
+    run.add_argument('--fleet', type=truck_type, action='append', metavar='CAPACITY=COST',
+                     help='Truck type for the mixed_fleet strategy; repeat for each type (default: 5k, 10k, 20k)')
+    run.add_argument('--lead-time', type=lead_time, action='append', metavar='DC=WEEKS',
+                     help='Lead time per DC; enables the time-phased inventory stage')
+    run.add_argument('--opening-stock', type=int, default=0)
+    run.add_argument('--forecast-periods', type=int, default=0, help='Weeks to forecast and plan (0 = none)')
+    run.add_argument('--forecast-model', choices=sorted(FORECAST_MODELS), default='mean')
+    run.add_argument('--festival-weeks', type=int, nargs='*', default=None)
+    run.add_argument('--festival-multiplier', type=float, default=1.5)
+    run.add_argument('--production-cost', type=float, default=1.0)
+    run.add_argument('--transport-cost', type=float, default=200.0)
+    run.add_argument('--inventory-cost', type=float, default=0.5)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = {name: value for name, value in vars(args).items() if name not in ('command', 'inputs', 'workers', 'lead_time', 'fleet')}
+    settings['partial_threshold'] = args.partial_threshold / 100
+    settings['lead_time_map'] = dict(args.lead_time) if args.lead_time else None
+    settings['fleet'] = {f"{capacity // 1000}k" if capacity % 1000 == 0 else str(capacity): (capacity, cost)
+                         for capacity, cost in args.fleet} if args.fleet else None
+    
+    results = run_batch(args.inputs, settings, max_workers=args.workers)
+    
+    summary = results.drop(columns=[column for column in ('output', 'run_id') if column in results.columns])
+    for column in ('rows_in', 'rows_out', 'total_trucks'):
+        if column in summary.columns:
+            summary[column] = summary[column].astype('Int64')
+    print(summary.to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+    timing_columns = [f'{stage}_s' for stage in STAGES if f'{stage}_s' in results.columns]
+    if timing_columns:
+        print('\nStage timings (s, summed over files):')
+        for column, seconds in results[timing_columns].sum().items():
+            print(f'  {column[:-2]:<10} {seconds:8.3f}')
+    
+    failed = results['error'].notna().sum() if 'error' in results.columns else 0
+    if failed:
+        print(f'\n{failed} of {len(results)} files failed', file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
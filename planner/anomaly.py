@@ -1,33 +1,83 @@
-from sklearn.ensemble import IsolationForest
-import pandas as pd
+from collections import OrderedDict
+import numpy as np
+from planner.pipeline import fingerprint_frame
 
-def detect_anomalies(df):
+MAX_TRAINING_ROWS = 200_000
+MAX_CACHED_MODELS = 4
+SCORING_CHUNK_ROWS = 100_000
+N_JOBS = -1
+ROBUST_Z_THRESHOLD = 3.5
+
+model_cache = OrderedDict()
+
+def anomaly_features(df):
+    features = []
+    for column in ('demand', 'allocated', 'shipped'):
+        if column in df.columns and df[column].sum() > 0:
+            features.append(column)
+    return features
+
+def fit_anomaly_model(train_df, features):
+    key = (tuple(features), fingerprint_frame(train_df[features]))
+    if key in model_cache:
+        model_cache.move_to_end(key)
+        return model_cache[key]
+    
+    training = train_df[features]
+    if len(training) > MAX_TRAINING_ROWS:
+        training = training.sample(MAX_TRAINING_ROWS, random_state=42)
+    
+    from sklearn.ensemble import IsolationForest
+    contamination = min(0.05, max(0.01, 3/len(train_df)))
+    model = IsolationForest(contamination=contamination, max_samples='auto', n_jobs=N_JOBS, random_state=42)
+    model.fit(training.to_numpy(dtype=float))
+    
+    model_cache[key] = model
+    while len(model_cache) > MAX_CACHED_MODELS:
+        model_cache.popitem(last=False)
+    return model
+
+def score_anomalies(model, df, features):
+    from joblib import Parallel, delayed
+    values = df[features].to_numpy(dtype=float)
+    chunks = [values[start:start + SCORING_CHUNK_ROWS] for start in range(0, len(values), SCORING_CHUNK_ROWS)]
+    predictions = Parallel(n_jobs=N_JOBS, prefer='threads')(delayed(model.predict)(chunk) for chunk in chunks)
+    return np.concatenate(predictions) == -1
+
+def robust_z_anomalies(df, features, threshold=ROBUST_Z_THRESHOLD):
+    keys = [df['sku'], df['dc']]
+    flags = np.zeros(len(df), dtype=bool)
+    for feature in features:
+        values = df[feature].astype(float)
+        median = values.groupby(keys, observed=True).transform('median')
+        deviation = (values - median).abs()
+        mad = deviation.groupby(keys, observed=True).transform('median')
+        mean_ad = deviation.groupby(keys, observed=True).transform('mean')
+        scale = (mad / 0.6745).where(mad > 0, 1.2533 * mean_ad)
+        z_score = deviation / scale.where(scale > 0)
+        flags |= (z_score > threshold).fillna(False).to_numpy()
+    return flags
+
+def detect_anomalies(df, method='isolation_forest', train_df=None):
+    df = df.copy()
     if len(df) < 10:
         df['anomaly'] = False
         return df
     
+    features = anomaly_features(df)
+    
+    if method == 'robust_z':
+        df['anomaly'] = robust_z_anomalies(df, features) if features else False
+        return df
+    
+    if len(features) < 2:
+        df['anomaly'] = False
+        return df
+    
     try:
-        features = []
-        if 'demand' in df.columns and df['demand'].sum() > 0:
-            features.append('demand')
-        if 'allocated' in df.columns and df['allocated'].sum() > 0:
-            features.append('allocated')
-        if 'shipped' in df.columns and df['shipped'].sum() > 0:
-            features.append('shipped')
-        
-        if len(features) < 2:
-            df['anomaly'] = False
-            return df
-            
-        contamination = min(0.05, max(0.01, 3/len(df)))
-        
-        clf = IsolationForest(contamination=contamination, random_state=42)
-        preds = clf.fit_predict(df[features])
-        df['anomaly'] = preds == -1
-        
-    except Exception as e:
+        model = fit_anomaly_model(train_df if train_df is not None else df, features)
+        df['anomaly'] = score_anomalies(model, df, features)
+    except ValueError:
         df['anomaly'] = False
     
     return df
-
-
@@ -0,0 +1,153 @@
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from planner.ingest import read_demand_file, save_plan
+from planner.forecasting import forecast_demand
+from planner.events import festival_calendar
+from planner.production import allocate_production
+from planner.shipment import enhanced_truck_planning
+from planner.inventory import time_phased_plan
+from planner.metrics import PlanKPIs
+from database.db_utils import create_tables, save_shipment_plan
+
+STAGES = ('ingest', 'forecast', 'allocate', 'trucks', 'inventory', 'metrics', 'persist')
+DEFAULT_SETTINGS = {
+    'max_capacity': 150000,
+    'allocation_method': 'proportional',
+    'truck_size': 10000,
+    'strategy': 'partial_trucks',
+    'partial_threshold': 0.6,
+    'safety_stock': 5000,
+    'lead_time_map': None,
+    'opening_stock': 0,
+    'forecast_periods': 0,
+    'forecast_model': 'mean',
+    'festival_weeks': None,
+    'festival_multiplier': 1.5,
+    'production_cost': 1.0,
+    'transport_cost': 200.0,
+    'inventory_cost': 0.5,
+    'fleet': None,
+    'output_dir': None,
+    'db_path': None
+}
+
+worker_state = {}
+
+def init_worker(db_lock):
+    worker_state['db_lock'] = db_lock
+
+def timed(timings, name, compute):
+    start = time.perf_counter()
+    result = compute()
+    timings[name] = time.perf_counter() - start
+    return result
+
+def forecast_and_combine(demand_df, settings):
+    forecast_df = forecast_demand(demand_df, periods=settings['forecast_periods'], model=settings['forecast_model'])
+    if settings['festival_weeks']:
+        forecast_df = festival_calendar(settings['festival_weeks'], settings['festival_multiplier']).apply(forecast_df)
+    return pd.concat([demand_df, forecast_df], ignore_index=True)
+
+def output_names(paths):
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    return {
+        path: stem if stems.count(stem) == 1 else
+        f"{stem}-{hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]}"
+        for path, stem in zip(paths, stems)
+    }
+
+def persist_plan(path, shipment_df, settings, output_name=None):
+    output_name = output_name or os.path.splitext(os.path.basename(path))[0]
+    output_path, run_id = None, None
+    if settings['output_dir']:
+        output_path = os.path.join(settings['output_dir'], f"{output_name}.parquet")
+        save_plan(shipment_df, output_path)
+    if settings['db_path']:
+        with worker_state['db_lock']:
+            run_id = save_shipment_plan(shipment_df, db_path=settings['db_path'])
+    return output_path, run_id
+
+def plan_file(path, settings, output_name=None):
+    settings = {**DEFAULT_SETTINGS, **settings}
+    timings = {}
+    
+    demand_df = timed(timings, 'ingest', lambda: read_demand_file(path, path))
+    rows_in = len(demand_df)
+    if settings['forecast_periods']:
+        demand_df = timed(timings, 'forecast', lambda: forecast_and_combine(demand_df, settings))
+    
+    lp_options = {
+        'lead_time_map': settings['lead_time_map'],
+        'truck_size': settings['truck_size'],
+        'safety_stock': settings['safety_stock'],
+        'opening_stock': settings['opening_stock'],
+        'production_cost': settings['production_cost'],
+        'transport_cost': settings['transport_cost'],
+        'inventory_cost': settings['inventory_cost']
+    }
+    allocated_df = timed(timings, 'allocate',
+                         lambda: allocate_production(demand_df, settings['max_capacity'],
+                                                     settings['allocation_method'], lp_options=lp_options))
+    shipment_df = timed(timings, 'trucks',
+                        lambda: enhanced_truck_planning(allocated_df, settings['truck_size'], settings['strategy'],
+                                                        settings['partial_threshold'], settings['safety_stock'],
+                                                        settings['fleet']))
+    if settings['lead_time_map']:
+        shipment_df = timed(timings, 'inventory',
+                            lambda: time_phased_plan(shipment_df, settings['lead_time_map'],
+                                                     settings['opening_stock'], settings['safety_stock']))
+    
+    metrics = timed(timings, 'metrics', lambda: PlanKPIs.from_frame(shipment_df).overall())
+    output_path, run_id = timed(timings, 'persist', lambda: persist_plan(path, shipment_df, settings, output_name))
+    
+    return {
+        'file': path,
+        'rows_in': rows_in,
+        'rows_out': len(shipment_df),
+        'service_level': metrics['service_level'],
+        'truck_utilization': metrics['truck_utilization'],
+        'total_trucks': metrics['total_trucks'],
+        'all_safety_met': metrics['all_safety_met'],
+        'output': output_path,
+        'run_id': run_id,
+        **{f'{stage}_s': timings.get(stage, 0.0) for stage in STAGES},
+        'total_s': sum(timings.values())
+    }
+
+def run_batch(paths, settings, max_workers=None):
+    settings = {**DEFAULT_SETTINGS, **settings}
+    paths = list(dict.fromkeys(paths))
+    names = output_names(paths)
+    if settings['output_dir']:
+        os.makedirs(settings['output_dir'], exist_ok=True)
+    if settings['db_path']:
+        create_tables(settings['db_path'])
+    
+    db_lock = multiprocessing.Lock()
+    max_workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    results = []
+    if max_workers <= 1:
+        init_worker(db_lock)
+        for path in paths:
+            results.append(plan_file_safely(path, settings, names[path]))
+        return pd.DataFrame(results)
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(db_lock,)) as executor:
+        futures = {executor.submit(plan_file, path, settings, names[path]): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except (ValueError, KeyError, OSError, RuntimeError) as error:
+                results.append({'file': futures[future], 'error': f'{type(error).__name__}: {error}'})
+    order = {path: position for position, path in enumerate(paths)}
+    return pd.DataFrame(results).sort_values('file', key=lambda files: files.map(order)).reset_index(drop=True)
+
+def plan_file_safely(path, settings, output_name=None):
+    try:
+        return plan_file(path, settings, output_name)
+    except (ValueError, KeyError, OSError, RuntimeError) as error:
+        return {'file': path, 'error': f'{type(error).__name__}: {error}'}
@@ -1,42 +1,152 @@
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from collections import OrderedDict
 import pandas as pd
+import numpy as np
 
-def cluster_skus(df, n_clusters=4):
+CLUSTER_FEATURES = ['total_demand', 'demand_volatility']
+MINIBATCH_THRESHOLD = 10_000
+SILHOUETTE_SAMPLE = 5_000
+K_RANGE = range(2, 9)
+MAX_CACHED_STORES = 4
+STAT_COLUMNS = ('sku', 'week', 'demand', 'allocated', 'shipped', 'closing_inventory')
+
+store_cache = OrderedDict()
+
+def sku_statistics(df):
+    demand = df['demand'].astype(float)
+    allocated = df['allocated'].astype(float) if 'allocated' in df.columns else demand
+    stock_column = 'closing_inventory' if 'closing_inventory' in df.columns else 'shipped'
+    stock = df[stock_column].astype(float) if stock_column in df.columns else allocated
+    return pd.DataFrame({
+        'sku': df['sku'],
+        'count': 1,
+        'demand_sum': demand,
+        'demand_sq_sum': demand ** 2,
+        'allocated_sum': allocated,
+        'stock_sum': stock
+    }).groupby('sku', observed=True).sum()
+
+def row_digest(df):
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+class SkuFeatureStore:
+    def __init__(self):
+        self.stats = None
+        self.model = None
+        self.weeks = set()
+        self.digest = 0
+        self.results = {}
+    
+    def update(self, df):
+        partial = sku_statistics(df)
+        self.stats = partial if self.stats is None else self.stats.add(partial, fill_value=0)
+        if 'week' in df.columns:
+            self.weeks.update(df['week'].unique())
+        self.digest = (self.digest + row_digest(df[[column for column in STAT_COLUMNS if column in df.columns]])) % 2**64
+        self.results = {}
+        return self
+    
+    def features(self):
+        stats = self.stats
+        count = stats['count']
+        variance = (stats['demand_sq_sum'] - stats['demand_sum'] ** 2 / count) / (count - 1).where(count > 1)
+        return pd.DataFrame({
+            'sku': stats.index,
+            'avg_demand': (stats['demand_sum'] / count).to_numpy(),
+            'demand_volatility': np.sqrt(variance.clip(lower=0)).fillna(0).to_numpy(),
+            'total_demand': stats['demand_sum'].to_numpy(),
+            'avg_allocated': (stats['allocated_sum'] / count).to_numpy(),
+            'total_allocated': stats['allocated_sum'].to_numpy(),
+            'avg_safety_stock': (stats['stock_sum'] / count).to_numpy()
+        })
+    
+    def minibatch_labels(self, scaled, n_clusters):
+        from sklearn.cluster import MiniBatchKMeans
+        if self.model is None or self.model.n_clusters != n_clusters:
+            self.model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=4096, n_init=3, random_state=42)
+            self.model.fit(scaled)
+        else:
+            self.model.partial_fit(scaled)
+        return self.model.predict(scaled)
+
+def cached_store(df):
+    df = df[[column for column in STAT_COLUMNS if column in df.columns]]
+    key = (tuple(df.columns), row_digest(df['sku'].drop_duplicates()))
+    store = store_cache.get(key)
+    seen = df['week'].isin(store.weeks) if store is not None and 'week' in df.columns else pd.Series(True, index=df.index)
+    if store is None or row_digest(df[seen]) != store.digest:
+        store = store_cache[key] = SkuFeatureStore().update(df)
+        while len(store_cache) > MAX_CACHED_STORES:
+            store_cache.popitem(last=False)
+    elif not seen.all():
+        store.update(df[~seen])
+    store_cache.move_to_end(key)
+    return store
+
+def select_n_clusters(scaled, k_range=K_RANGE):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+    rng = np.random.default_rng(42)
+    sample = scaled[rng.choice(len(scaled), min(len(scaled), SILHOUETTE_SAMPLE), replace=False)]
+    best_k, best_score = min(k_range), -1.0
+    for k in k_range:
+        if k >= len(sample):
+            break
+        labels = MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=42).fit_predict(sample)
+        if len(set(labels)) < 2:
+            continue
+        score = silhouette_score(sample, labels)
+        if score > best_score:
+            best_k, best_score = k, score
+    return best_k
+
+def cluster_skus(df, n_clusters=4, method='auto', store=None):
     if df.empty or 'sku' not in df.columns:
         return pd.DataFrame()
-        
-    sku_features = df.groupby('sku').agg({
-        'demand': ['mean', 'std', 'sum'],
-        'allocated': ['mean', 'sum']
-    }).reset_index()
     
-    sku_features.columns = ['sku', 'avg_demand', 'demand_volatility', 'total_demand', 'avg_allocated', 'total_allocated']
-    sku_features['demand_volatility'] = sku_features['demand_volatility'].fillna(0)
+    store = store or cached_store(df)
+    result_key = (n_clusters, method)
+    if result_key in store.results:
+        return store.results[result_key].copy()
+    sku_features = store.features()
     
     n_samples = sku_features.shape[0]
     
     if n_samples == 0:
         return pd.DataFrame(columns=['sku', 'avg_demand', 'total_demand', 'cluster'])
+    store.results[result_key] = sku_features
     
     if n_samples == 1:
         sku_features['cluster'] = 0
-        return sku_features
-    
-    n_clusters = min(n_clusters, n_samples)
+        return sku_features.copy()
     
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
     try:
-        features_for_clustering = ['total_demand', 'demand_volatility']
-        scaler = StandardScaler()
-        scaled_features = scaler.fit_transform(sku_features[features_for_clustering])
+        scaled_features = StandardScaler().fit_transform(sku_features[CLUSTER_FEATURES])
         
-        kmeans = KMeans(n_clusters=n_clusters, init="k-means++", n_init=10, max_iter=300, random_state=42)
-        sku_features['cluster'] = kmeans.fit_predict(scaled_features)
+        if n_clusters == 'auto':
+            n_clusters = select_n_clusters(scaled_features)
+        n_clusters = min(n_clusters, n_samples)
         
-    except Exception as e:
+        if method == 'minibatch' or (method == 'auto' and n_samples > MINIBATCH_THRESHOLD):
+            sku_features['cluster'] = store.minibatch_labels(scaled_features, n_clusters)
+        else:
+            kmeans = KMeans(n_clusters=n_clusters, init="k-means++", n_init=10, max_iter=300, random_state=42)
+            sku_features['cluster'] = kmeans.fit_predict(scaled_features)
+        
+    except ValueError:
+        n_clusters = min(4 if n_clusters == 'auto' else n_clusters, n_samples)
         sku_features['cluster'] = pd.cut(sku_features['total_demand'], bins=n_clusters, labels=False)
     
-    return sku_features
-
-
+    return sku_features.copy()
 
+def cluster_quality(clusters_df):
+    from sklearn.metrics import silhouette_score
+    from sklearn.preprocessing import StandardScaler
+    if clusters_df is None or clusters_df.empty or clusters_df['cluster'].nunique() < 2:
+        return 0.0
+    scaled_features = StandardScaler().fit_transform(clusters_df[CLUSTER_FEATURES])
+    sample_size = min(len(clusters_df), SILHOUETTE_SAMPLE)
+    if sample_size <= clusters_df['cluster'].nunique():
+        return 0.0
+    return float(silhouette_score(scaled_features, clusters_df['cluster'], sample_size=sample_size, random_state=42))
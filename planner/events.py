@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = ['event', 'kind', 'week', 'sku', 'dc', 'uplift']
+EVENT_KINDS = ('festival', 'holiday', 'promotion')
+SCOPES = (('week',), ('week', 'sku'), ('week', 'dc'), ('week', 'sku', 'dc'))
+
+class EventCalendar:
+    def __init__(self, events=None):
+        self.events = pd.DataFrame(columns=EVENT_COLUMNS) if events is None else events[EVENT_COLUMNS].copy()
+    
+    def add_event(self, name, weeks, uplift, skus=None, dcs=None, kind='festival'):
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown event kind '{kind}'. Choose from: {', '.join(EVENT_KINDS)}")
+        if uplift <= 0:
+            raise ValueError("Event uplift must be positive")
+        index = pd.MultiIndex.from_product([list(weeks), list(skus) if skus else [None], list(dcs) if dcs else [None]],
+                                           names=['week', 'sku', 'dc'])
+        rows = index.to_frame(index=False)
+        rows.insert(0, 'kind', kind)
+        rows.insert(0, 'event', name)
+        rows['uplift'] = float(uplift)
+        self.events = rows if self.events.empty else pd.concat([self.events, rows], ignore_index=True)
+        return self
+    
+    def scope_table(self, keys):
+        events = self.events
+        scoped = np.ones(len(events), dtype=bool)
+        for column in ('sku', 'dc'):
+            scoped &= events[column].notna().to_numpy() == (column in keys)
+        return events[scoped].groupby(list(keys))['uplift'].prod()
+    
+    def multipliers(self, df):
+        multiplier = np.ones(len(df))
+        if self.events.empty or df.empty:
+            return multiplier
+        
+        week_table = self.scope_table(('week',))
+        if not week_table.empty:
+            event_weeks = week_table.index.to_numpy(dtype=np.int64)
+            weeks = df['week'].to_numpy(dtype=np.int64)
+            mask = np.isin(weeks, event_weeks)
+            multiplier[mask] *= week_table.to_numpy()[np.searchsorted(event_weeks, weeks[mask])]
+        
+        for keys in SCOPES[1:]:
+            table = self.scope_table(keys)
+            if table.empty:
+                continue
+            table = table.reset_index()
+            for column in keys[1:]:
+                table[column] = table[column].astype(str)
+            lookup = df[list(keys)].astype({column: str for column in keys[1:]})
+            factors = lookup.merge(table, on=list(keys), how='left')['uplift']
+            multiplier *= factors.fillna(1.0).to_numpy()
+        return multiplier
+    
+    def apply(self, df, column='demand'):
+        df = df.copy()
+        if not self.events.empty:
+            df[column] = df[column] * self.multipliers(df)
+        return df
+
+def festival_calendar(festival_weeks, multiplier):
+    return EventCalendar().add_event('festival', festival_weeks, multiplier)
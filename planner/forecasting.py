@@ -1,27 +1,156 @@
 import pandas as pd
+import numpy as np
 
-def forecast_demand(history_df, year=2025, periods=6):
-    if history_df.empty:
-        return pd.DataFrame()
-        
-    forecast_results = []
+SMOOTHING_GRID = np.linspace(0.1, 0.9, 9)
+TREND_GRID = np.array([0.05, 0.1, 0.2, 0.3])
+SEASON_LENGTH = 52
+
+def build_series_matrix(history_df):
+    pivot = history_df.pivot_table(index=['sku', 'dc'], columns='week', values='demand',
+                                   aggfunc='sum', observed=True)
+    if pivot.empty:
+        return pivot
+    all_weeks = np.arange(pivot.columns.min(), pivot.columns.max() + 1)
+    return pivot.reindex(columns=all_weeks)
+
+def first_observed(values):
+    observed = ~np.isnan(values)
+    first = values[np.arange(values.shape[0]), observed.argmax(axis=1)]
+    return np.nan_to_num(first)
+
+def mean_forecast(values, periods):
+    steps = np.arange(periods)
+    pattern = 0.9 + 0.2 * (steps % 3)
+    counts = (~np.isnan(values)).sum(axis=1)
+    totals = np.nansum(values, axis=1)
+    avg_demand = np.fmax(np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0), 1000)
+    return np.maximum(500, (avg_demand[:, None] * pattern).astype(np.int64)).astype(float)
+
+def exponential_smoothing(values, periods, trend=False):
+    if trend:
+        alpha_grid, beta_grid = np.meshgrid(SMOOTHING_GRID, TREND_GRID)
+        alpha, beta = alpha_grid.ravel()[:, None], beta_grid.ravel()[:, None]
+    else:
+        alpha, beta = SMOOTHING_GRID[:, None], np.zeros((len(SMOOTHING_GRID), 1))
     
-    for (sku, dc), group in history_df.groupby(['sku', 'dc']):
-        try:
-            avg_demand = max(1000, group['demand'].mean())
-            last_week = group['week'].max()
-            
-            for i in range(periods):
-                week = last_week + i + 1
-                demand = max(500, int(avg_demand * (0.9 + 0.2 * (i % 3))))
-                forecast_results.append(pd.DataFrame({
-                    'sku': [sku], 'dc': [dc], 'week': [week], 'demand': [demand]
-                }))
-                
-        except Exception as e:
-            continue
+    n_series = values.shape[0]
+    level = np.tile(first_observed(values), (len(alpha), 1))
+    slope = np.zeros_like(level)
+    sse = np.zeros_like(level)
     
-    return pd.concat(forecast_results, ignore_index=True) if forecast_results else pd.DataFrame()
+    for t in range(1, values.shape[1]):
+        actual = values[:, t]
+        prediction = level + slope
+        error = np.where(np.isnan(actual), 0.0, actual - prediction)
+        sse += error ** 2
+        level = prediction + alpha * error
+        slope = slope + alpha * beta * error
+    
+    best = sse.argmin(axis=0)
+    series = np.arange(n_series)
+    horizon = np.arange(1, periods + 1)
+    return level[best, series][:, None] + slope[best, series][:, None] * horizon
 
+def simple_exponential_smoothing(values, periods):
+    return exponential_smoothing(values, periods, trend=False)
 
+def holt_forecast(values, periods):
+    return exponential_smoothing(values, periods, trend=True)
 
+def seasonal_naive(values, periods, season_length=SEASON_LENGTH):
+    filled = pd.DataFrame(values).ffill(axis=1).to_numpy()
+    observed = ~np.isnan(values)
+    first = observed.argmax(axis=1)
+    last = values.shape[1] - 1 - observed[:, ::-1].argmax(axis=1)
+    season = min(season_length, values.shape[1])
+    
+    rows = np.arange(values.shape[0])[:, None]
+    columns = last[:, None] - season + 1 + np.arange(periods) % season
+    seasonal = filled[rows, np.maximum(columns, 0)]
+    naive = filled[rows, last[:, None]]
+    forecast = np.where((last - first + 1 >= season)[:, None], seasonal, naive)
+    return np.nan_to_num(forecast)
+
+FORECAST_MODELS = {
+    'mean': mean_forecast,
+    'ses': simple_exponential_smoothing,
+    'holt': holt_forecast,
+    'seasonal_naive': seasonal_naive
+}
+
+def forecast_matrix(values, periods, model='mean'):
+    if model not in FORECAST_MODELS:
+        raise ValueError(f"Unknown forecast model '{model}', expected one of {sorted(FORECAST_MODELS)}")
+    return FORECAST_MODELS[model](values, periods)
+
+def forecast_demand(history_df, year=2025, periods=6, model='mean'):
+    if history_df.empty or periods <= 0:
+        return pd.DataFrame()
+    
+    if model != 'mean':
+        return forecast_from_matrix(build_series_matrix(history_df), periods, model)
+    
+    group_stats = history_df.groupby(['sku', 'dc'], observed=True).agg(
+        avg_demand=('demand', 'mean'),
+        last_week=('week', 'max')
+    ).reset_index()
+    
+    if group_stats.empty:
+        return pd.DataFrame()
+    
+    steps = np.arange(periods)
+    pattern = 0.9 + 0.2 * (steps % 3)
+    
+    avg_demand = np.fmax(group_stats['avg_demand'].to_numpy(dtype=float), 1000)
+    demand = np.maximum(500, (avg_demand[:, None] * pattern).astype(np.int64))
+    weeks = group_stats['last_week'].to_numpy()[:, None] + steps + 1
+    
+    return pd.DataFrame({
+        'sku': np.repeat(group_stats['sku'].to_numpy(), periods),
+        'dc': np.repeat(group_stats['dc'].to_numpy(), periods),
+        'week': weeks.ravel(),
+        'demand': demand.ravel()
+    })
+
+def forecast_from_matrix(pivot, periods, model):
+    if pivot.empty:
+        return pd.DataFrame()
+    
+    values = pivot.to_numpy(dtype=float)
+    forecast = forecast_matrix(values, periods, model)
+    
+    observed = ~np.isnan(values)
+    last_week = pivot.columns.to_numpy()[values.shape[1] - 1 - observed[:, ::-1].argmax(axis=1)]
+    weeks = last_week[:, None] + np.arange(1, periods + 1)
+    
+    return pd.DataFrame({
+        'sku': np.repeat(pivot.index.get_level_values('sku').to_numpy(), periods),
+        'dc': np.repeat(pivot.index.get_level_values('dc').to_numpy(), periods),
+        'week': weeks.ravel(),
+        'demand': np.maximum(0, np.rint(forecast)).astype(np.int64).ravel()
+    })
+
+def backtest_forecast(history_df, model='mean', holdout=4):
+    columns = ['sku', 'mape', 'mae', 'accuracy_score']
+    if history_df.empty:
+        return pd.DataFrame(columns=columns)
+    
+    pivot = build_series_matrix(history_df)
+    values = pivot.to_numpy(dtype=float)
+    holdout = min(holdout, values.shape[1] - 1)
+    if holdout < 1:
+        return pd.DataFrame(columns=columns)
+    
+    actual = values[:, -holdout:]
+    predicted = forecast_matrix(values[:, :-holdout], holdout, model)
+    abs_error = np.abs(actual - predicted)
+    pct_error = np.where(actual > 0, abs_error / np.where(actual > 0, actual, 1), np.nan) * 100
+    
+    errors = pd.DataFrame({
+        'sku': np.repeat(pivot.index.get_level_values('sku').to_numpy(), holdout),
+        'mape': pct_error.ravel(),
+        'mae': abs_error.ravel()
+    })
+    accuracy = errors.groupby('sku', observed=True)[['mape', 'mae']].mean().reset_index()
+    accuracy['accuracy_score'] = (100 - accuracy['mape']).clip(0, 100)
+    return accuracy[columns]
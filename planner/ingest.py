@@ -0,0 +1,168 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+DEMAND_DTYPES = {'sku': 'category', 'dc': 'category', 'week': 'int32', 'demand': 'int32'}
+MAX_CACHED_UPLOADS = 8
+DICTIONARY_COLUMNS = ['sku', 'dc']
+PLAN_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'plans')
+UPLOAD_TYPES = ['csv', 'parquet', 'feather', 'arrow']
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Feather': ('feather', 'application/vnd.apache.arrow.file')
+}
+
+class UploadCache:
+    def __init__(self, max_entries=MAX_CACHED_UPLOADS):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+    
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+upload_cache = UploadCache()
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+def read_demand_csv(source):
+    try:
+        return pd.read_csv(source, dtype=DEMAND_DTYPES)
+    except (ValueError, TypeError):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, dtype={'sku': 'category', 'dc': 'category'})
+
+def file_format(file_name):
+    extension = os.path.splitext(str(file_name))[1].lower().lstrip('.')
+    if extension in ('feather', 'arrow', 'ipc'):
+        return 'feather'
+    if extension in ('parquet', 'pq'):
+        return 'parquet'
+    return 'csv'
+
+def apply_demand_dtypes(demand_df):
+    demand_df = demand_df.copy()
+    for column, dtype in DEMAND_DTYPES.items():
+        if column not in demand_df.columns or demand_df[column].dtype == dtype:
+            continue
+        if dtype == 'category':
+            demand_df[column] = demand_df[column].astype('category')
+        elif (demand_df[column] % 1 == 0).all():
+            demand_df[column] = demand_df[column].astype(dtype)
+    return demand_df
+
+def read_demand_file(source, file_name='upload.csv'):
+    fmt = file_format(file_name)
+    if fmt == 'parquet':
+        return apply_demand_dtypes(pd.read_parquet(source))
+    if fmt == 'feather':
+        return apply_demand_dtypes(pd.read_feather(source))
+    return read_demand_csv(source)
+
+def summarize_demand(demand_df):
+    return {
+        'total_skus': demand_df['sku'].nunique(),
+        'total_dcs': demand_df['dc'].nunique(),
+        'total_weeks': demand_df['week'].nunique(),
+        'total_demand': demand_df['demand'].sum()
+    }
+
+def load_demand_upload(data, file_name='upload.csv', cache=upload_cache):
+    key = content_hash(data)
+    cached = cache.get(key)
+    if cached is None:
+        demand_df = read_demand_file(io.BytesIO(data), file_name)
+        cached = (key, demand_df, summarize_demand(demand_df))
+        cache.put(key, cached)
+    return cached
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+def iter_demand_chunks(source, chunksize=DEFAULT_CHUNK_ROWS, file_name=None):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    fmt = file_format(file_name if file_name is not None else getattr(source, 'name', source))
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(source).iter_batches(batch_size=chunksize)
+        return (apply_demand_dtypes(batch.to_pandas()) for batch in batches)
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+        table = feather.read_table(source, memory_map=isinstance(source, str))
+        return (apply_demand_dtypes(batch.to_pandas()) for batch in table.to_batches(max_chunksize=chunksize))
+    return pd.read_csv(source, dtype={'sku': 'category', 'dc': 'category'}, chunksize=chunksize)
+
+def dictionary_encode(df):
+    df = df.copy()
+    for column in DICTIONARY_COLUMNS:
+        if column in df.columns and df[column].dtype != 'category':
+            df[column] = df[column].astype('category')
+    return df
+
+def export_frame(df, fmt='CSV'):
+    extension = EXPORT_FORMATS[fmt][0]
+    if extension == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    buffer = io.BytesIO()
+    if extension == 'parquet':
+        dictionary_encode(df).to_parquet(buffer, index=False)
+    else:
+        dictionary_encode(df).reset_index(drop=True).to_feather(buffer)
+    return buffer.getvalue()
+
+def save_plan(df, path):
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        dictionary_encode(df).to_parquet(path, index=False)
+    elif fmt == 'feather':
+        dictionary_encode(df).reset_index(drop=True).to_feather(path, compression='uncompressed')
+    else:
+        df.to_csv(path, index=False)
+
+def list_saved_plans(directory=PLAN_DIR):
+    plans = []
+    for root, _, files in os.walk(directory):
+        plans.extend(os.path.relpath(os.path.join(root, name), directory) for name in files
+                     if file_format(name) != 'csv')
+    return sorted(plans)
+
+def plan_columns(path):
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_schema(path, memory_map=True).names
+    if fmt == 'feather':
+        import pyarrow.ipc as ipc
+        return ipc.open_file(path).schema.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def load_plan(path, columns=None):
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(path, usecols=columns)
@@ -0,0 +1,35 @@
+import pandas as pd
+import numpy as np
+from planner.series import series_order
+
+def time_phased_plan(df, lead_time_map, opening_stock=0, safety_stock=5000, default_lead_time=1):
+    if df.empty:
+        return df
+    
+    df = df.copy()
+    lead_time = df['dc'].map(lead_time_map).fillna(default_lead_time).astype(int).to_numpy()
+    week = df['week'].to_numpy(dtype=np.int64)
+    
+    order, series_sorted, first_in_series, restore = series_order(df)
+    week_sorted = week[order]
+    
+    cumulative_shipped = pd.Series(df['shipped'].to_numpy(dtype=float)[order]).groupby(series_sorted).cumsum().to_numpy()
+    cumulative_demand = pd.Series(df['demand'].to_numpy(dtype=float)[order]).groupby(series_sorted).cumsum().to_numpy()
+    
+    span = week_sorted.max() - min(week_sorted.min() - lead_time.max(), 0) + 1
+    keys = series_sorted * span + week_sorted
+    series_start = np.searchsorted(series_sorted, series_sorted, side='left')
+    arrived = np.searchsorted(keys, keys - lead_time[order], side='right') - 1
+    cumulative_receipts = np.where(arrived >= series_start, cumulative_shipped[np.maximum(arrived, 0)], 0.0)
+    
+    receipts = cumulative_receipts - np.where(first_in_series, 0.0, np.r_[0.0, cumulative_receipts[:-1]])
+    closing = opening_stock + cumulative_receipts - cumulative_demand
+    
+    df['lead_time'] = lead_time
+    df['receipt_week'] = week + lead_time
+    df['receipts'] = receipts[restore].astype(int)
+    df['closing_inventory'] = closing[restore].astype(int)
+    df['opening_inventory'] = df['closing_inventory'] - df['receipts'] + df['demand'].astype(int)
+    df['safety_met'] = df['closing_inventory'] >= safety_stock
+    
+    return df
@@ -1,19 +1,48 @@
+import numpy as np
 import pandas as pd
 
-def calculate_metrics(fulldata):
-    if fulldata.empty:
+KPI_LEVELS = (('week',), ('dc',), ('sku',), ('week', 'dc'))
+KPI_COLUMNS = ['demand', 'allocated', 'shipped', 'total_trucks', 'safety_met', 'fill_rate', 'truck_utilization']
+
+def kpi_measures(df):
+    demand = df['demand'].to_numpy(dtype=float)
+    allocated = df['allocated'].to_numpy(dtype=float) if 'allocated' in df.columns else demand
+    shipped = df['shipped'].to_numpy(dtype=float) if 'shipped' in df.columns else allocated
+    trucks = df['total_trucks'].to_numpy(dtype=float) if 'total_trucks' in df.columns else np.zeros(len(df))
+    safety = df['safety_met'].fillna(True).to_numpy(dtype=float) if 'safety_met' in df.columns else np.ones(len(df))
+    if 'truck_utilization' in df.columns:
+        utilization = df['truck_utilization'].to_numpy(dtype=float)
+        utilization_rows = ~np.isnan(utilization)
+        utilization = np.where(utilization_rows, utilization, 0.0)
+    else:
+        utilization, utilization_rows = np.zeros(len(df)), np.zeros(len(df), dtype=bool)
+    return {
+        'rows': np.ones(len(df)),
+        'demand': demand,
+        'allocated': allocated,
+        'shipped': shipped,
+        'total_trucks': trucks,
+        'safety_met': safety,
+        'utilization_sum': utilization,
+        'utilization_rows': utilization_rows.astype(float)
+    }
+
+def metrics_from_totals(totals):
+    if totals['rows'] == 0:
         return {
             'total_demand': 0,
             'total_shipped': 0,
+            'total_trucks': 0,
             'service_level': 0,
             'truck_utilization': 0,
             'all_safety_met': False
         }
     
     metrics = {}
-    metrics['total_demand'] = int(fulldata['demand'].sum())
-    metrics['total_shipped'] = int(fulldata.get('shipped', fulldata.get('allocated', 0)).sum())
-    metrics['total_allocated'] = int(fulldata.get('allocated', fulldata.get('demand', 0)).sum())
+    metrics['total_demand'] = int(totals['demand'])
+    metrics['total_shipped'] = int(totals['shipped'])
+    metrics['total_allocated'] = int(totals['allocated'])
+    metrics['total_trucks'] = int(totals['total_trucks'])
     
     if metrics['total_demand'] > 0:
         metrics['service_level'] = 100 * metrics['total_shipped'] / metrics['total_demand']
@@ -22,25 +51,104 @@ def calculate_metrics(fulldata):
         metrics['service_level'] = 0
         metrics['allocation_efficiency'] = 0
     
-    metrics['all_safety_met'] = fulldata.get('safety_met', pd.Series([True])).all()
+    metrics['all_safety_met'] = bool(totals['safety_met'] == totals['rows'])
     
-    if 'truck_utilization' in fulldata.columns and not fulldata['truck_utilization'].isna().all():
-        metrics['truck_utilization'] = fulldata['truck_utilization'].mean()
+    if totals['utilization_rows'] > 0:
+        metrics['truck_utilization'] = totals['utilization_sum'] / totals['utilization_rows']
     else:
         metrics['truck_utilization'] = 0
     
     return metrics
 
-def highlight_violations(df):
-    def highlight(row):
-        if not row.get('safety_met', True):
-            return ['background-color: #fce4e4'] * len(row)
-        if row.get('allocated', 0) < row.get('demand', 0):
-            return ['background-color: #fff4c2'] * len(row)
-        if row.get('truck_utilization', 100) < 70:
-            return ['background-color: #e6f3ff'] * len(row)
-        return [''] * len(row)
-    return df.style.apply(highlight, axis=1)
+def calculate_metrics(fulldata):
+    if fulldata.empty:
+        return metrics_from_totals({'rows': 0})
+    return metrics_from_totals({name: values.sum() for name, values in kpi_measures(fulldata).items()})
+
+class PlanKPIs:
+    def __init__(self, tables=None):
+        self.tables = tables or {}
+    
+    @classmethod
+    def from_frame(cls, df):
+        if df.empty:
+            return cls()
+        codes = {column: pd.factorize(df[column], sort=True) for column in ('week', 'dc', 'sku')}
+        valid = np.logical_and.reduce([code >= 0 for code, _ in codes.values()])
+        measures = {name: values[valid] for name, values in kpi_measures(df).items()}
+        
+        tables = {}
+        for level in KPI_LEVELS:
+            code, size = np.zeros(valid.sum(), dtype=np.int64), 1
+            for column in level:
+                column_codes, uniques = codes[column]
+                code = code * len(uniques) + column_codes[valid]
+                size *= len(uniques)
+            uniques = [np.asarray(codes[column][1]) for column in level]
+            index = (pd.Index(uniques[0], name=level[0]) if len(level) == 1
+                     else pd.MultiIndex.from_product(uniques, names=level))
+            table = pd.DataFrame({name: np.bincount(code, weights=values, minlength=size)
+                                  for name, values in measures.items()}, index=index)
+            tables[level] = table[table['rows'] > 0]
+        return cls(tables)
+    
+    def merge(self, other):
+        if not self.tables:
+            return other
+        if not other.tables:
+            return self
+        return PlanKPIs({level: pd.concat([self.tables[level], other.tables[level]])
+                                   .groupby(level=list(range(len(level)))).sum()
+                         for level in KPI_LEVELS})
+    
+    def totals(self):
+        if not self.tables:
+            return {'rows': 0}
+        return self.tables[KPI_LEVELS[0]].sum().to_dict()
+    
+    def overall(self):
+        return metrics_from_totals(self.totals())
+    
+    def by(self, keys, aggregates=None):
+        keys = (keys,) if isinstance(keys, str) else tuple(keys)
+        if keys not in KPI_LEVELS:
+            raise ValueError(f"KPIs are only kept by {', '.join('/'.join(level) for level in KPI_LEVELS)}")
+        aggregates = list(aggregates or KPI_COLUMNS)
+        if not self.tables:
+            return pd.DataFrame(columns=list(keys) + aggregates)
+        table = self.tables[keys]
+        result = table[['demand', 'allocated', 'shipped', 'total_trucks']].copy()
+        result['safety_met'] = table['safety_met'] / table['rows']
+        result['fill_rate'] = 100.0 * table['allocated'] / table['demand'].where(table['demand'] != 0)
+        result['truck_utilization'] = table['utilization_sum'] / table['utilization_rows'].where(table['utilization_rows'] > 0)
+        return result.reset_index()[list(keys) + aggregates]
+
+LOW_UTILIZATION = 70
+VIOLATION_COLORS = {
+    'safety_breach': 'background-color: #fce4e4',
+    'under_allocated': 'background-color: #fff4c2',
+    'low_utilization': 'background-color: #e6f3ff',
+    'ok': ''
+}
+
+def classify_violations(df, utilization_threshold=LOW_UTILIZATION):
+    zeros = np.zeros(len(df))
+    safety_met = df['safety_met'].fillna(True).to_numpy(dtype=bool) if 'safety_met' in df.columns else ~zeros.astype(bool)
+    allocated = df['allocated'].to_numpy(dtype=float) if 'allocated' in df.columns else zeros
+    demand = df['demand'].to_numpy(dtype=float) if 'demand' in df.columns else zeros
+    utilization = df['truck_utilization'].to_numpy(dtype=float) if 'truck_utilization' in df.columns else zeros + 100
+    codes = np.select([~safety_met, allocated < demand, utilization < utilization_threshold],
+                      [0, 1, 2], default=3).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=list(VIOLATION_COLORS))
 
+def violation_mask(status):
+    return pd.Categorical(status, categories=list(VIOLATION_COLORS)).codes != 3
 
+def violation_index(status):
+    return np.flatnonzero(violation_mask(status))
 
+def highlight_violations(df, utilization_threshold=LOW_UTILIZATION):
+    status = df['status'] if 'status' in df.columns else classify_violations(df, utilization_threshold)
+    colors = pd.Series(status, index=df.index).astype(str).map(VIOLATION_COLORS).to_numpy()
+    styles = pd.DataFrame(np.repeat(colors[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+    return df.style.apply(lambda _: styles, axis=None)
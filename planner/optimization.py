@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from planner.production import weekly_capacity_table
+from planner.series import series_order
+
+class AllocationLP:
+    def __init__(self, demand_df, lead_time_map=None, default_lead_time=1):
+        from scipy import sparse
+        
+        self.demand_df = demand_df
+        n = len(demand_df)
+        self.n = n
+        
+        lead_time = demand_df['dc'].map(lead_time_map or {}).fillna(default_lead_time).astype(int).to_numpy()
+        week = demand_df['week'].to_numpy(dtype=np.int64)
+        order, series_sorted, self.first_in_series, position = series_order(demand_df)
+        week_sorted = week[order]
+        
+        span = week_sorted.max() - week_sorted.min() + lead_time.max() + 2
+        keys = series_sorted * span + (week_sorted - week_sorted.min())
+        series_last = np.flatnonzero(np.r_[self.first_in_series[1:], True])
+        series_last = series_last[np.cumsum(self.first_in_series) - 1]
+        arrival = np.searchsorted(keys, keys + lead_time[order], side='left')
+        arrives = arrival <= series_last
+        
+        rows = np.arange(n)
+        x, inventory, shortage, safety_gap = 0, n, 2 * n, 3 * n
+        eq_rows = np.concatenate([rows, rows[~self.first_in_series], arrival[arrives], rows])
+        eq_cols = np.concatenate([inventory + rows, inventory + rows[~self.first_in_series] - 1,
+                                  x + rows[arrives], shortage + rows])
+        eq_vals = np.concatenate([np.ones(n), -np.ones((~self.first_in_series).sum()),
+                                  -np.ones(arrives.sum()), -np.ones(n)])
+        self.A_eq = sparse.csr_matrix((eq_vals, (eq_rows, eq_cols)), shape=(n, 4 * n))
+        
+        week_codes, self.weeks = pd.factorize(week_sorted, sort=True)
+        ub_rows = np.concatenate([rows, rows, n + week_codes])
+        ub_cols = np.concatenate([inventory + rows, safety_gap + rows, x + rows])
+        ub_vals = np.concatenate([-np.ones(n), -np.ones(n), np.ones(n)])
+        self.A_ub = sparse.csr_matrix((ub_vals, (ub_rows, ub_cols)), shape=(n + len(self.weeks), 4 * n))
+        
+        self.order = order
+        self.position = position
+        self.demand = demand_df['demand'].to_numpy(dtype=float)[order]
+    
+    def solve(self, max_capacity=150000, truck_size=5000, safety_stock=5000, opening_stock=0,
+              production_cost=1.0, transport_cost=200.0, inventory_cost=0.5,
+              shortage_penalty=None, safety_penalty=None, method='highs-ipm'):
+        from scipy.optimize import linprog
+        
+        n = self.n
+        unit_cost = production_cost + transport_cost / truck_size
+        if shortage_penalty is None:
+            shortage_penalty = 10 * (unit_cost + inventory_cost) + 1
+        if safety_penalty is None:
+            safety_penalty = unit_cost + 2 * inventory_cost
+        
+        c = np.concatenate([np.full(n, unit_cost), np.full(n, inventory_cost),
+                            np.full(n, shortage_penalty), np.full(n, safety_penalty)])
+        b_eq = -self.demand + np.where(self.first_in_series, opening_stock, 0)
+        b_ub = np.concatenate([np.full(n, -float(safety_stock)), weekly_capacity_table(self.weeks, max_capacity)])
+        
+        result = linprog(c, A_ub=self.A_ub, b_ub=b_ub, A_eq=self.A_eq, b_eq=b_eq,
+                         bounds=(0, None), method=method)
+        if result.status != 0:
+            raise RuntimeError(f"Allocation LP failed: {result.message}")
+        
+        solution = result.x.reshape(4, n)
+        return solution[:, self.position], result.fun
+
+def optimize_allocation(demand_df, max_capacity=150000, lead_time_map=None, model=None, **options):
+    if demand_df.empty:
+        return demand_df
+    
+    model = model or AllocationLP(demand_df, lead_time_map)
+    solution, _ = model.solve(max_capacity, **options)
+    
+    demand_df = demand_df.copy()
+    demand_df['allocated'] = np.floor(solution[0] + 1e-6).astype(int)
+    demand_df['planned_inventory'] = np.round(solution[1]).astype(int)
+    demand_df['planned_shortage'] = np.round(solution[2]).astype(int)
+    return demand_df.reset_index(drop=True)
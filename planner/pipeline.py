@@ -0,0 +1,84 @@
+import hashlib
+import pandas as pd
+from planner.production import allocate_production
+from planner.shipment import enhanced_truck_planning
+from planner.metrics import PlanKPIs
+from planner.inventory import time_phased_plan
+from planner.optimization import AllocationLP
+from planner.profiling import row_count
+
+def freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def fingerprint_frame(df):
+    digest = hashlib.sha1(','.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+class PlanningPipeline:
+    def __init__(self, profiler=None):
+        self.cache = {}
+        self.recomputed = []
+        self.profiler = profiler
+    
+    def stage(self, name, key, compute, rows_in=None):
+        cached = self.cache.get(name)
+        if cached is not None and cached[0] == key:
+            if self.profiler is not None:
+                self.profiler.record_cached(name, row_count(cached[1]))
+            return cached[1]
+        if self.profiler is None:
+            result = compute()
+        else:
+            with self.profiler.stage(name, rows_in) as record:
+                result = compute()
+                record['rows_out'] = row_count(result)
+        self.cache[name] = (key, result)
+        self.recomputed.append(name)
+        return result
+    
+    def run(self, demand_df, max_capacity=150000, allocation_method='proportional', truck_size=5000,
+            strategy='partial', partial_threshold=0.6, safety_stock=5000, fleet=None,
+            lead_time_map=None, opening_stock=0, lp_options=None, data_key=None):
+        self.recomputed = []
+        if data_key is None:
+            data_key = fingerprint_frame(demand_df)
+        
+        if allocation_method == 'cost_optimized':
+            lp_options = dict(lp_options or {})
+            model_key = (data_key, freeze(lp_options.get('lead_time_map')))
+            lp_options['model'] = self.stage('lp_model', model_key,
+                                             lambda: AllocationLP(demand_df, lp_options.get('lead_time_map')),
+                                             len(demand_df))
+        
+        allocation_key = (data_key, max_capacity, allocation_method)
+        if allocation_method == 'cost_optimized':
+            allocation_key += (freeze({name: value for name, value in lp_options.items() if name != 'model'}),)
+        allocated_df = self.stage('allocation', allocation_key,
+                                  lambda: allocate_production(demand_df, max_capacity, allocation_method,
+                                                              lp_options=lp_options),
+                                  len(demand_df))
+        
+        shipment_key = allocation_key + (truck_size, strategy, partial_threshold, safety_stock, freeze(fleet))
+        shipment_df = self.stage('shipment', shipment_key,
+                                 lambda: enhanced_truck_planning(allocated_df, truck_size, strategy,
+                                                                 partial_threshold, safety_stock, fleet),
+                                 len(allocated_df))
+        
+        if lead_time_map is not None:
+            shipment_key = shipment_key + (freeze(lead_time_map), opening_stock)
+            shipment_df = self.stage('inventory', shipment_key,
+                                     lambda: time_phased_plan(shipment_df, lead_time_map, opening_stock, safety_stock),
+                                     len(shipment_df))
+        
+        kpis = self.stage('metrics', shipment_key, lambda: PlanKPIs.from_frame(shipment_df), len(shipment_df))
+        metrics = kpis.overall()
+        metrics['kpis'] = kpis
+        return shipment_df, metrics
+    
+    def clear(self):
+        self.cache.clear()
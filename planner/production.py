@@ -1,35 +1,69 @@
 import pandas as pd
+import numpy as np
 
 def get_weekly_capacity(week, base_capacity=150000):
     if week >= 4:
         return int(base_capacity * 0.85)
     return base_capacity
 
-def allocate_production(demand_df, max_capacity=150000):
+def weekly_capacity_table(weeks, base_capacity=150000):
+    return np.array([get_weekly_capacity(week, base_capacity) for week in weeks], dtype=float)
+
+def largest_remainder_round(quota, week_codes, leftover, weights=None):
+    allocated = np.floor(quota).astype(np.int64)
+    remainder = quota - allocated
+    if weights is not None:
+        remainder = remainder * weights
+    
+    order = np.argsort(week_codes, kind='stable')
+    bounds = np.searchsorted(week_codes[order], np.arange(len(leftover) + 1))
+    
+    for code in np.flatnonzero(leftover > 0):
+        rows = order[bounds[code]:bounds[code + 1]]
+        k = min(int(leftover[code]), len(rows))
+        if k == 0:
+            continue
+        if k < len(rows):
+            top = np.argpartition(-remainder[rows], k - 1)[:k]
+            rows = rows[top]
+        allocated[rows] += 1
+    
+    return allocated
+
+def allocate_production(demand_df, max_capacity=150000, method='proportional', priority=None, week_totals=None,
+                        lp_options=None):
     if demand_df.empty:
         return demand_df
     
+    if method == 'cost_optimized':
+        from planner.optimization import optimize_allocation
+        return optimize_allocation(demand_df, max_capacity, **(lp_options or {}))
+    
     demand_df = demand_df.copy()
-    week_data = []
-    
-    for week in sorted(demand_df['week'].unique()):
-        week_df = demand_df[demand_df['week'] == week].copy()
-        total_demand = week_df['demand'].sum()
-        
-        weekly_capacity = get_weekly_capacity(week, max_capacity)
-        
-        if total_demand <= weekly_capacity:
-            week_df['allocated'] = week_df['demand']
-        elif total_demand > 0:
-            week_df['allocated'] = (week_df['demand'] / total_demand) * weekly_capacity
-        else:
-            week_df['allocated'] = 0
-            
-        week_df['allocated'] = week_df['allocated'].astype(int)
-        week_data.append(week_df)
-    
-    return pd.concat(week_data, ignore_index=True)
-
-
-
-
+    
+    week_codes, weeks = pd.factorize(demand_df['week'], sort=True)
+    demand = demand_df['demand'].to_numpy(dtype=float)
+    
+    if week_totals is None:
+        total_demand = np.bincount(week_codes, weights=demand, minlength=len(weeks))
+    else:
+        total_demand = week_totals.reindex(weeks).fillna(0).to_numpy(dtype=float)
+    weekly_capacity = weekly_capacity_table(weeks, max_capacity)
+    over_capacity = total_demand > weekly_capacity
+    
+    row_over = over_capacity[week_codes]
+    row_total = np.where(over_capacity, total_demand, 1.0)[week_codes]
+    
+    allocated = np.where(row_over, (demand / row_total) * weekly_capacity[week_codes], demand)
+    
+    if method == 'largest_remainder':
+        floored = np.bincount(week_codes, weights=np.floor(allocated), minlength=len(weeks))
+        leftover = np.where(over_capacity, np.rint(weekly_capacity - floored), 0).astype(np.int64)
+        weights = None
+        if priority is not None:
+            weights = demand_df['sku'].map(priority).fillna(1.0).to_numpy(dtype=float)
+        demand_df['allocated'] = largest_remainder_round(allocated, week_codes, leftover, weights)
+    else:
+        demand_df['allocated'] = allocated.astype(int)
+    
+    return demand_df.reset_index(drop=True)
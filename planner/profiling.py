@@ -0,0 +1,105 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+import pandas as pd
+
+PROFILE_MODES = (None, 'tracemalloc', 'cprofile')
+PROFILE_TOP_FUNCTIONS = 15
+
+def row_count(value):
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+class StageProfiler:
+    def __init__(self, mode=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}'. Choose from: tracemalloc, cprofile")
+        self.mode = mode
+        self.records = []
+        self.active = []
+    
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None, 'cached': False}
+        profile = cProfile.Profile() if self.mode == 'cprofile' else None
+        if self.mode == 'tracemalloc':
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            elif self.active:
+                parent = self.active[-1]
+                parent['traced_peak'] = max(parent['traced_peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            record['traced_start'] = record['traced_peak'] = tracemalloc.get_traced_memory()[0]
+        self.active.append(record)
+        rss_start = max_rss_mb()
+        if profile is not None:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                output = io.StringIO()
+                pstats.Stats(profile, stream=output).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+                record['profile'] = output.getvalue()
+            self.active.pop()
+            if self.mode == 'tracemalloc':
+                peak = max(record.pop('traced_peak'), tracemalloc.get_traced_memory()[1])
+                record['stage_peak_mb'] = (peak - record.pop('traced_start')) / 2**20
+                if started:
+                    tracemalloc.stop()
+            rss_end = max_rss_mb()
+            record['max_rss_growth_mb'] = None if rss_start is None else rss_end - rss_start
+            self.records.append(record)
+    
+    def track(self, name, func, *args, **kwargs):
+        rows_in = next((row_count(arg) for arg in args if row_count(arg) is not None), None)
+        with self.stage(name, rows_in) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = row_count(result)
+        return result
+    
+    def profiled(self, name=None):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                return self.track(name or func.__name__, func, *args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def record_cached(self, name, rows_out=None):
+        self.records.append({'stage': name, 'rows_in': None, 'rows_out': rows_out, 'cached': True,
+                             'wall_s': 0.0, 'max_rss_growth_mb': 0.0})
+    
+    def to_frame(self):
+        columns = ['stage', 'wall_s', 'rows_in', 'rows_out', 'cached', 'max_rss_growth_mb']
+        if self.mode == 'tracemalloc':
+            columns.append('stage_peak_mb')
+        return pd.DataFrame(self.records).reindex(columns=columns).astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+    
+    def to_json(self):
+        return json.dumps({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'mode': self.mode,
+            'total_s': sum(record['wall_s'] for record in self.records),
+            'stages': self.records
+        }, indent=2)
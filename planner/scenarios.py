@@ -0,0 +1,59 @@
+import itertools
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from planner.ingest import save_plan, load_plan
+from planner.pipeline import PlanningPipeline
+
+SWEEP_PARAMETERS = ['max_capacity', 'allocation_method', 'truck_size', 'strategy', 'partial_threshold', 'safety_stock']
+DEMAND_COLUMNS = ['sku', 'dc', 'week', 'demand']
+
+worker_state = {}
+
+def scenario_grid(**grids):
+    names = [name for name in SWEEP_PARAMETERS if name in grids]
+    return [dict(zip(names, values)) for values in itertools.product(*(grids[name] for name in names))]
+
+def init_worker(path, fleet=None, lp_options=None):
+    worker_state['demand_df'] = load_plan(path, columns=DEMAND_COLUMNS)
+    worker_state['pipeline'] = PlanningPipeline()
+    worker_state['data_key'] = path
+    worker_state['fleet'] = fleet
+    worker_state['lp_options'] = lp_options
+
+def run_scenario(params):
+    pipeline = worker_state['pipeline']
+    lp_options = worker_state['lp_options']
+    if lp_options is not None:
+        lp_options = {**lp_options, **{name: params[name] for name in ('truck_size', 'safety_stock')
+                                       if name in params and name in lp_options}}
+    shipment_df, metrics = pipeline.run(worker_state['demand_df'], data_key=worker_state['data_key'],
+                                        fleet=worker_state['fleet'], lp_options=lp_options, **params)
+    return {
+        **params,
+        'service_level': metrics['service_level'],
+        'truck_utilization': metrics['truck_utilization'],
+        'total_trucks': metrics['total_trucks'],
+        'total_shipped': metrics['total_shipped'],
+        'all_safety_met': bool(metrics['all_safety_met'])
+    }
+
+def run_scenario_sweep(demand_df, scenarios, fleet=None, lp_options=None, max_workers=None):
+    if demand_df.empty or not scenarios:
+        return pd.DataFrame()
+    
+    allocation_params = ['max_capacity', 'allocation_method']
+    scenarios = sorted(scenarios, key=lambda params: tuple(str(params.get(name)) for name in allocation_params))
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, math.ceil(len(scenarios) / (max_workers * 4)))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'demand.feather')
+        save_plan(demand_df[DEMAND_COLUMNS], path)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                 initargs=(path, fleet, lp_options)) as executor:
+            results = list(executor.map(run_scenario, scenarios, chunksize=chunksize))
+    
+    return pd.DataFrame(results)
@@ -0,0 +1,10 @@
+import numpy as np
+
+def series_order(df):
+    series = df.groupby(['sku', 'dc'], observed=True, sort=False).ngroup().to_numpy()
+    order = np.lexsort((df['week'].to_numpy(), series))
+    series_sorted = series[order]
+    first_in_series = np.diff(series_sorted, prepend=-1) != 0
+    restore = np.empty_like(order)
+    restore[order] = np.arange(len(order))
+    return order, series_sorted, first_in_series, restore
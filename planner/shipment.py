@@ -1,7 +1,186 @@
 import pandas as pd
 import numpy as np
+from planner.series import series_order
 
-def enhanced_truck_planning(df, truck_size=5000, strategy='partial', partial_threshold=0.6, safety_stock=5000):
+DEFAULT_FLEET = {
+    '5k': (5000, 150.0),
+    '10k': (10000, 250.0),
+    '20k': (20000, 420.0)
+}
+
+def build_fleet_table(fleet):
+    names = list(fleet)
+    capacities = np.array([fleet[name][0] for name in names], dtype=np.int64)
+    costs = np.array([fleet[name][1] for name in names], dtype=float)
+    step = int(np.gcd.reduce(capacities))
+    steps = capacities // step
+    
+    cost_per_unit = costs / capacities
+    base = int(np.lexsort((-capacities, cost_per_unit))[0])
+    period = int(steps[base])
+    size = period * int(steps.max()) + period
+    
+    min_cost = np.full(size + 1, np.inf)
+    min_cost[0] = 0.0
+    counts = np.zeros((size + 1, len(names)), dtype=np.int64)
+    for units in range(1, size + 1):
+        options = costs + min_cost[np.maximum(units - steps, 0)]
+        choice = int(options.argmin())
+        min_cost[units] = options[choice]
+        counts[units] = counts[max(units - steps[choice], 0)]
+        counts[units, choice] += 1
+    
+    return {'names': names, 'capacities': capacities, 'costs': costs, 'step': step,
+            'base': base, 'period': period, 'min_cost': min_cost, 'counts': counts}
+
+def lookup_fleet(table, loads):
+    units = np.ceil(np.asarray(loads, dtype=float) / table['step']).astype(np.int64)
+    size = len(table['min_cost']) - 1
+    bulk = np.maximum(0, -((size - units) // table['period']))
+    residual = units - bulk * table['period']
+    
+    counts = table['counts'][residual].copy()
+    counts[:, table['base']] += bulk
+    cost = table['min_cost'][residual] + bulk * table['costs'][table['base']]
+    return counts, cost
+
+def assign_fleet(df, fleet=None):
+    table = build_fleet_table(fleet or DEFAULT_FLEET)
+    lanes = df.groupby(['dc', 'week'], observed=True)['allocated'].sum().reset_index(name='load')
+    counts, cost = lookup_fleet(table, lanes['load'].to_numpy())
+    for position, name in enumerate(table['names']):
+        lanes[f'trucks_{name}'] = counts[:, position]
+    lanes['total_trucks'] = counts.sum(axis=1)
+    lanes['capacity'] = counts @ table['capacities']
+    lanes['fleet_cost'] = cost
+    lanes['truck_utilization'] = np.where(
+        lanes['capacity'] > 0,
+        (lanes['load'] / lanes['capacity'].where(lanes['capacity'] > 0, 1) * 100).round(2),
+        0
+    )
+    return lanes
+
+def first_fit_decreasing(sizes, group_codes, capacity):
+    bins = np.full(len(sizes), -1)
+    items = np.flatnonzero(sizes > 0)
+    if len(items) == 0:
+        return bins, np.zeros((0, 0))
+    
+    groups = group_codes[items]
+    n_groups = groups.max() + 1
+    items = items[np.lexsort((-sizes[items], groups))]
+    groups = group_codes[items]
+    
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(items)) - starts[groups]
+    totals = np.bincount(groups, weights=sizes[items], minlength=n_groups)
+    max_bins = int(min(counts.max(), np.ceil(2 * totals.max() / capacity) + 1))
+    
+    remaining = np.full((n_groups, max_bins), float(capacity))
+    by_rank = np.argsort(rank, kind='stable')
+    bounds = np.searchsorted(rank[by_rank], np.arange(counts.max() + 1))
+    
+    for r in range(counts.max()):
+        batch = by_rank[bounds[r]:bounds[r + 1]]
+        batch_groups = groups[batch]
+        batch_sizes = sizes[items[batch]]
+        slot = (remaining[batch_groups] >= batch_sizes[:, None]).argmax(axis=1)
+        remaining[batch_groups, slot] -= batch_sizes
+        bins[items[batch]] = slot
+    
+    return bins, capacity - remaining
+
+def consolidate_remainders(df, truck_size, partial_threshold):
+    allocated = df['allocated'].to_numpy(dtype=float)
+    full_trucks = (allocated // truck_size).astype(int)
+    remaining_units = allocated % truck_size
+    
+    lane = df.groupby(['dc', 'week'], observed=True, sort=False).ngroup().to_numpy()
+    bins, fill = first_fit_decreasing(remaining_units, lane, truck_size)
+    
+    packed = bins >= 0
+    bin_fill = np.zeros(len(df))
+    bin_fill[packed] = fill[lane[packed], bins[packed]]
+    dispatched = packed & (bin_fill >= truck_size * partial_threshold)
+    
+    bin_key = np.where(dispatched, lane * max(fill.shape[1], 1) + bins, -1)
+    by_size = np.lexsort((-remaining_units, bin_key))
+    _, first = np.unique(bin_key[by_size], return_index=True)
+    lead = np.zeros(len(df), dtype=bool)
+    lead[by_size[first]] = True
+    lead &= dispatched
+    
+    shipped = full_trucks * truck_size + np.where(dispatched, remaining_units, 0)
+    truck_share = full_trucks + np.where(dispatched, remaining_units / np.where(dispatched, bin_fill, 1), 0)
+    
+    df['full_trucks'] = full_trucks
+    df['remaining_units'] = remaining_units
+    df['shared_truck'] = np.where(dispatched, bins, -1)
+    df['shared_trucks'] = lead.astype(int)
+    df['total_trucks'] = full_trucks + df['shared_trucks']
+    df['shipped'] = shipped.astype(int)
+    df['truck_utilization'] = np.where(
+        truck_share > 0,
+        (shipped / np.where(truck_share > 0, truck_share, 1) / truck_size * 100).round(2),
+        0
+    )
+    return df
+
+def batch_next_week(df, truck_size, partial_threshold):
+    order, series_sorted, first_in_series, restore = series_order(df)
+    allocated = df['allocated'].to_numpy(dtype=float)[order]
+    
+    cumulative = pd.Series(allocated).groupby(series_sorted).cumsum().to_numpy()
+    shipped_cumulative = (cumulative // truck_size) * truck_size
+    carried_out = cumulative - shipped_cumulative
+    
+    last_in_series = np.r_[first_in_series[1:], True]
+    previous_shipped = np.where(first_in_series, 0, np.r_[0, shipped_cumulative[:-1]])
+    carried_in = np.where(first_in_series, 0, np.r_[0, carried_out[:-1]])
+    
+    shipped = shipped_cumulative - previous_shipped
+    full_trucks = (shipped // truck_size).astype(int)
+    flush = last_in_series & (carried_out > 0) & (carried_out >= truck_size * partial_threshold)
+    shipped = shipped + np.where(flush, carried_out, 0)
+    carried_out = np.where(flush, 0, carried_out)
+    total_trucks = full_trucks + flush.astype(int)
+    
+    df['carried_in'] = carried_in[restore].astype(int)
+    df['full_trucks'] = full_trucks[restore]
+    df['total_trucks'] = total_trucks[restore]
+    df['shipped'] = shipped[restore].astype(int)
+    df['carried_out'] = carried_out[restore].astype(int)
+    
+    df['truck_utilization'] = np.where(
+        df['total_trucks'] > 0,
+        (df['shipped'] / (df['total_trucks'].where(df['total_trucks'] > 0, 1) * truck_size) * 100).round(2),
+        0
+    )
+    return df
+
+def plan_mixed_fleet(df, fleet=None):
+    lanes = assign_fleet(df, fleet)
+    truck_columns = [column for column in lanes.columns if column.startswith('trucks_')]
+    
+    lane = df.groupby(['dc', 'week'], observed=True, sort=True).ngroup().to_numpy()
+    allocated = df['allocated'].to_numpy(dtype=float)
+    load = lanes['load'].to_numpy(dtype=float)[lane]
+    
+    by_size = np.lexsort((-allocated, lane))
+    _, first = np.unique(lane[by_size], return_index=True)
+    lead = np.zeros(len(df), dtype=bool)
+    lead[by_size[first]] = True
+    
+    for column in truck_columns + ['total_trucks']:
+        df[column] = np.where(lead, lanes[column].to_numpy()[lane], 0)
+    df['shipped'] = allocated.astype(int)
+    df['fleet_cost'] = lanes['fleet_cost'].to_numpy()[lane] * np.divide(
+        allocated, load, out=np.zeros_like(allocated), where=load > 0)
+    df['truck_utilization'] = lanes['truck_utilization'].to_numpy()[lane]
+    return df
+
+def enhanced_truck_planning(df, truck_size=5000, strategy='partial', partial_threshold=0.6, safety_stock=5000, fleet=None):
     if df.empty:
         return df
     
@@ -27,16 +206,21 @@ def enhanced_truck_planning(df, truck_size=5000, strategy='partial', partial_thr
             (df['shipped'] / (df['total_trucks'] * truck_size) * 100).round(2),
             0
         )
+    elif strategy == 'consolidation':
+        df = consolidate_remainders(df, truck_size, partial_threshold)
+    elif strategy == 'next_week_batching':
+        df = batch_next_week(df, truck_size, partial_threshold)
+    elif strategy == 'mixed_fleet':
+        df = plan_mixed_fleet(df, fleet)
     else:
         df['total_trucks'] = (df['allocated'] // truck_size).astype(int)
         df['shipped'] = df['total_trucks'] * truck_size
         df['truck_utilization'] = np.where(df['total_trucks'] > 0, 100.0, 0.0)
     
-    df['unshipped'] = df['allocated'] - df['shipped']
+    if strategy == 'next_week_batching':
+        df['unshipped'] = df['carried_out']
+    else:
+        df['unshipped'] = df['allocated'] - df['shipped']
     df['safety_met'] = df['shipped'] >= safety_stock
     
     return df
-
-
-
-
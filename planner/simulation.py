@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from planner.production import weekly_capacity_table
+
+PERCENTILES = [10, 50, 90]
+
+def fit_noise_model(history_df, min_cv=0.05):
+    stats = history_df.groupby(['sku', 'dc'], observed=True)['demand'].agg(['mean', 'std']).reset_index()
+    stats['cv'] = stats['std'] / stats['mean'].where(stats['mean'] > 0)
+    default_cv = stats['cv'].median() if stats['cv'].notna().any() else min_cv
+    stats['cv'] = stats['cv'].fillna(default_cv).clip(lower=min_cv)
+    return stats[['sku', 'dc', 'cv']]
+
+def simulate_demand_risk(demand_df, noise_model=None, trials=1000, max_capacity=150000, truck_size=5000,
+                         partial_threshold=0.6, safety_stock=5000, seed=42, batch_cells=5_000_000):
+    if demand_df.empty or trials <= 0:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    noise_model = noise_model if noise_model is not None else fit_noise_model(demand_df)
+    cv = demand_df[['sku', 'dc']].merge(noise_model, on=['sku', 'dc'], how='left')['cv']
+    cv = cv.fillna(noise_model['cv'].median() if not noise_model.empty else 0.1).to_numpy(dtype=float)
+    sigma = np.sqrt(np.log1p(cv ** 2)).astype(np.float32)
+    mu = (-sigma ** 2 / 2).astype(np.float32)
+    
+    base_demand = demand_df['demand'].to_numpy(dtype=np.float32)
+    week_codes, weeks = pd.factorize(demand_df['week'], sort=True)
+    capacity = weekly_capacity_table(weeks, max_capacity)
+    n_rows, n_weeks = len(base_demand), len(weeks)
+    
+    rng = np.random.default_rng(seed)
+    batch = max(1, batch_cells // n_rows)
+    outcomes = {'service_level': [], 'total_trucks': [], 'truck_utilization': [], 'safety_breach': []}
+    breach_counts = np.zeros(n_rows)
+    
+    for start in range(0, trials, batch):
+        size = min(batch, trials - start)
+        demand = base_demand * np.exp(mu + sigma * rng.standard_normal((size, n_rows), dtype=np.float32))
+        
+        cells = (np.arange(size)[:, None] * n_weeks + week_codes).ravel()
+        totals = np.bincount(cells, weights=demand.ravel(), minlength=size * n_weeks).reshape(size, n_weeks)
+        over = totals > capacity
+        share = np.where(over, capacity / np.where(over, totals, 1), 1.0)
+        allocated = np.floor(demand * share[:, week_codes].astype(np.float32))
+        
+        full_trucks = allocated // truck_size
+        remaining = allocated - full_trucks * truck_size
+        use_partial = remaining >= truck_size * partial_threshold
+        trucks = full_trucks + use_partial
+        shipped = full_trucks * truck_size + use_partial * remaining
+        utilization = np.where(trucks > 0, shipped / np.where(trucks > 0, trucks, 1) / truck_size * 100, 0)
+        breach = shipped < safety_stock
+        
+        total_demand = demand.sum(axis=1)
+        outcomes['service_level'].append(100 * shipped.sum(axis=1) / np.where(total_demand > 0, total_demand, 1))
+        outcomes['total_trucks'].append(trucks.sum(axis=1))
+        outcomes['truck_utilization'].append(utilization.mean(axis=1))
+        outcomes['safety_breach'].append(breach.any(axis=1))
+        breach_counts += breach.sum(axis=0)
+    
+    outcomes = {name: np.concatenate(values) for name, values in outcomes.items()}
+    summary = pd.DataFrame([
+        {'metric': name, **{f'p{q}': value for q, value in zip(PERCENTILES, np.percentile(outcomes[name], PERCENTILES))},
+         'mean': outcomes[name].mean()}
+        for name in ('service_level', 'total_trucks', 'truck_utilization')
+    ])
+    summary = pd.concat([summary, pd.DataFrame([{
+        'metric': 'safety_breach_probability', 'mean': outcomes['safety_breach'].mean()
+    }])], ignore_index=True)
+    
+    row_risk = demand_df[['sku', 'dc', 'week', 'demand']].copy()
+    row_risk['breach_probability'] = breach_counts / trials
+    return summary, row_risk
@@ -0,0 +1,61 @@
+import glob
+import os
+import tempfile
+import pandas as pd
+from planner.ingest import iter_demand_chunks, DEFAULT_CHUNK_ROWS
+from planner.production import allocate_production
+from planner.shipment import enhanced_truck_planning
+from planner.metrics import PlanKPIs
+
+LANE_KEYS = {
+    'consolidation': ['dc', 'week'],
+    'mixed_fleet': ['dc', 'week'],
+    'next_week_batching': ['sku', 'dc']
+}
+
+def demand_totals(source, chunksize=DEFAULT_CHUNK_ROWS):
+    totals, n_rows = pd.Series(dtype=float), 0
+    for chunk in iter_demand_chunks(source, chunksize):
+        totals = totals.add(chunk.groupby('week')['demand'].sum(), fill_value=0)
+        n_rows += len(chunk)
+    return totals, n_rows
+
+def lane_buckets(df, keys, n_buckets):
+    hashed = pd.util.hash_pandas_object(df[keys].astype(str), index=False).to_numpy()
+    return hashed % n_buckets
+
+def spill_lanes(source, chunksize, keys, n_buckets, spill_dir, allocate):
+    for position, chunk in enumerate(iter_demand_chunks(source, chunksize)):
+        chunk_df = allocate(chunk)
+        for bucket, part in chunk_df.groupby(lane_buckets(chunk_df, keys, n_buckets)):
+            part.reset_index(drop=True).to_feather(os.path.join(spill_dir, f'{bucket}_{position}.feather'))
+    for bucket in range(n_buckets):
+        paths = glob.glob(os.path.join(spill_dir, f'{bucket}_*.feather'))
+        if paths:
+            yield pd.concat([pd.read_feather(path) for path in paths], ignore_index=True)
+
+def plan_streaming(source, max_capacity=150000, truck_size=5000, strategy='partial',
+                   partial_threshold=0.6, safety_stock=5000, chunksize=DEFAULT_CHUNK_ROWS, sink=None, fleet=None):
+    week_totals, n_rows = demand_totals(source, chunksize)
+    allocate = lambda chunk: allocate_production(chunk, max_capacity, week_totals=week_totals)
+    
+    kpis = PlanKPIs()
+    
+    with tempfile.TemporaryDirectory(prefix='planner_lanes_') as spill_dir:
+        if strategy in LANE_KEYS:
+            n_buckets = max(1, -(-n_rows // chunksize))
+            chunks = spill_lanes(source, chunksize, LANE_KEYS[strategy], n_buckets, spill_dir, allocate)
+        else:
+            chunks = (allocate(chunk) for chunk in iter_demand_chunks(source, chunksize))
+        
+        for chunk_df in chunks:
+            chunk_df = enhanced_truck_planning(chunk_df, truck_size, strategy, partial_threshold, safety_stock, fleet)
+            
+            if sink is not None:
+                sink(chunk_df)
+            
+            kpis = kpis.merge(PlanKPIs.from_frame(chunk_df))
+    
+    metrics = kpis.overall()
+    metrics['kpis'] = kpis
+    return metrics
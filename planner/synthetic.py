@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+def generate_demand(n_skus=50, n_dcs=5, n_weeks=52, seasonality=0.2, noise=0.1, trend=0.0,
+                    base_demand=10000, season_length=52, start_week=1, seed=42):
+    rng = np.random.default_rng(seed)
+    n_series = n_skus * n_dcs
+    
+    level = base_demand * rng.lognormal(0.0, 0.5, n_series).astype(np.float32)
+    phase = rng.uniform(0, 2 * np.pi, n_skus).astype(np.float32)
+    weeks = np.arange(start_week, start_week + n_weeks, dtype=np.int32)
+    season = 1 + seasonality * np.sin(2 * np.pi * weeks[None, :] / season_length + phase[:, None])
+    growth = 1 + trend * np.arange(n_weeks, dtype=np.float32)
+    
+    shape = np.repeat(season, n_dcs, axis=0) * growth
+    demand = level[:, None] * shape * (1 + noise * rng.standard_normal((n_series, n_weeks), dtype=np.float32))
+    
+    sku_codes = np.repeat(np.arange(n_skus, dtype=np.int32), n_dcs * n_weeks)
+    dc_codes = np.tile(np.repeat(np.arange(n_dcs, dtype=np.int32), n_weeks), n_skus)
+    return pd.DataFrame({
+        'sku': pd.Categorical.from_codes(sku_codes, [f'SKU{code:05d}' for code in range(n_skus)]),
+        'dc': pd.Categorical.from_codes(dc_codes, [f'DC{code:03d}' for code in range(n_dcs)]),
+        'week': np.tile(weeks, n_series),
+        'demand': np.clip(np.rint(demand), 0, None).astype(np.int32).ravel()
+    })
+
+def demand_of_size(n_rows, n_weeks=52, n_dcs=20, **kwargs):
+    n_series = max(1, -(-n_rows // n_weeks))
+    n_dcs = min(n_dcs, n_series)
+    n_skus = -(-n_series // n_dcs)
+    return generate_demand(n_skus, n_dcs, n_weeks, **kwargs).iloc[:n_rows]
@@ -0,0 +1,14 @@
+import pandas as pd
+from planner.anomaly import detect_anomalies
+
+def make_shipments(values):
+    return pd.DataFrame({'sku': 'Regular', 'dc': 'North', 'week': range(1, len(values) + 1), 'shipped': values})
+
+def test_robust_z_flags_spike_when_most_weeks_are_equal():
+    flagged = detect_anomalies(make_shipments([10000] * 11 + [90000]), method='robust_z')
+    assert flagged['anomaly'].tolist() == [False] * 11 + [True]
+
+def test_robust_z_uses_mad_and_ignores_constant_series():
+    spread = [9000, 9500, 10000, 10500, 11000, 9800, 10200, 9900, 10100, 10300, 9700, 30000]
+    assert detect_anomalies(make_shipments(spread), method='robust_z')['anomaly'].tolist() == [False] * 11 + [True]
+    assert not detect_anomalies(make_shipments([10000] * 12), method='robust_z')['anomaly'].any()
@@ -0,0 +1,32 @@
+import os
+import pandas as pd
+from planner.__main__ import build_parser, main
+from planner.batch import run_batch
+from planner.synthetic import generate_demand
+
+def write_inputs(tmp_path):
+    paths = []
+    for region, seed in (('north', 1), ('south', 2)):
+        os.makedirs(tmp_path / region)
+        path = str(tmp_path / region / 'demand.csv')
+        generate_demand(3, 2, 4, base_demand=6000, seed=seed).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def test_same_stem_inputs_get_distinct_outputs(tmp_path):
+    paths = write_inputs(tmp_path)
+    results = run_batch(paths, {'output_dir': str(tmp_path / 'plans')}, max_workers=1)
+    assert results['output'].nunique() == 2
+    for path, output in zip(paths, results['output']):
+        expected = pd.read_csv(path)
+        assert pd.read_parquet(output)['demand'].tolist() == expected['demand'].tolist()
+
+def test_fleet_option_reaches_truck_planning(tmp_path, capsys):
+    paths = write_inputs(tmp_path)[:1]
+    args = build_parser().parse_args(['run', *paths, '--fleet', '8000=300', '--fleet', '12000=400'])
+    assert args.fleet == [(8000, 300.0), (12000, 400.0)]
+    default = run_batch(paths, {'strategy': 'mixed_fleet'}, max_workers=1)
+    custom = run_batch(paths, {'strategy': 'mixed_fleet', 'fleet': {'8k': (8000, 300.0), '12k': (12000, 400.0)}},
+                       max_workers=1)
+    assert default['total_trucks'].item() != custom['total_trucks'].item()
+    assert main(['run', *paths, '--strategy', 'mixed_fleet', '--fleet', '8000=300', '--workers', '1']) == 0
@@ -0,0 +1,33 @@
+import pandas as pd
+from planner.clustering import SkuFeatureStore, cached_store, cluster_skus, store_cache
+from planner.synthetic import generate_demand
+
+def make_history():
+    demand = generate_demand(40, 2, 8, base_demand=5000)
+    return demand.assign(allocated=demand['demand'], shipped=demand['demand'])
+
+def test_new_weeks_update_the_cached_store():
+    store_cache.clear()
+    history = make_history()
+    early = history[history['week'] <= 5]
+    store = cached_store(early)
+    assert cached_store(history) is store
+    assert store.weeks == set(history['week'])
+    expected = SkuFeatureStore().update(history).features()
+    pd.testing.assert_frame_equal(store.features(), expected)
+
+def test_changed_history_rebuilds_the_store():
+    store_cache.clear()
+    history = make_history()
+    store = cached_store(history)
+    changed = history.assign(demand=history['demand'] + 1)
+    rebuilt = cached_store(changed)
+    assert rebuilt is not store
+    pd.testing.assert_frame_equal(rebuilt.features(), SkuFeatureStore().update(changed).features())
+
+def test_minibatch_labels_are_stable_across_reruns():
+    store_cache.clear()
+    history = make_history()
+    first = cluster_skus(history, n_clusters=3, method='minibatch')
+    for _ in range(3):
+        pd.testing.assert_frame_equal(cluster_skus(history, n_clusters=3, method='minibatch'), first)
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+from planner.events import EventCalendar
+
+def test_overlapping_event_scopes_multiply():
+    calendar = (EventCalendar()
+                .add_event('summer', [3], 1.5)
+                .add_event('launch', [3, 4], 1.1, skus=['Diet'])
+                .add_event('holiday', [3], 1.2, dcs=['North'], kind='holiday')
+                .add_event('promo', [3], 2.0, skus=['Diet'], dcs=['North'], kind='promotion'))
+    df = pd.DataFrame({'sku': ['Diet', 'Diet', 'Regular', 'Diet', 'Regular'],
+                       'dc': ['North', 'South', 'North', 'North', 'South'],
+                       'week': [3, 3, 3, 4, 5],
+                       'demand': 1000})
+    np.testing.assert_allclose(calendar.multipliers(df), [1.5 * 1.1 * 1.2 * 2.0, 1.5 * 1.1, 1.5 * 1.2, 1.1, 1.0])
+    np.testing.assert_allclose(calendar.apply(df)['demand'].iloc[0], 3960)
+
+def test_same_scope_events_stack_and_invalid_uplift_is_rejected():
+    calendar = EventCalendar().add_event('a', [1], 1.5).add_event('b', [1], 2.0)
+    df = pd.DataFrame({'sku': ['Diet'], 'dc': ['North'], 'week': [1], 'demand': [100]})
+    np.testing.assert_allclose(calendar.multipliers(df), [3.0])
+    with pytest.raises(ValueError):
+        calendar.add_event('bad', [1], 0)
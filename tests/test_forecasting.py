@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from planner.forecasting import backtest_forecast, forecast_demand, seasonal_naive
+
+def make_ragged_history():
+    return pd.concat([
+        pd.DataFrame({'sku': 'A', 'dc': 'North', 'week': range(1, 11), 'demand': 1000}),
+        pd.DataFrame({'sku': 'B', 'dc': 'North', 'week': range(5, 11), 'demand': 2000}),
+        pd.DataFrame({'sku': 'C', 'dc': 'North', 'week': range(1, 7), 'demand': 500})
+    ], ignore_index=True)
+
+def test_seasonal_naive_uses_each_series_own_history():
+    forecast = forecast_demand(make_ragged_history(), periods=6, model='seasonal_naive')
+    by_sku = forecast.groupby('sku')
+    assert by_sku['demand'].apply(list).to_dict() == {'A': [1000] * 6, 'B': [2000] * 6, 'C': [500] * 6}
+    assert by_sku['week'].min().to_dict() == {'A': 11, 'B': 11, 'C': 7}
+    accuracy = backtest_forecast(make_ragged_history(), model='seasonal_naive').set_index('sku')
+    assert accuracy.loc['B', 'mape'] == 0
+
+def test_seasonal_naive_repeats_season_aligned_to_last_week():
+    nan = np.nan
+    values = np.array([
+        [1, 2, 3, 4, 1, 2, 3, 4, nan, nan],
+        [nan, nan, 5, 6, 7, 8, 5, 6, 7, 8],
+        [nan, nan, nan, nan, nan, nan, nan, 9, 9, 3]
+    ])
+    forecast = seasonal_naive(values, 6, season_length=4)
+    np.testing.assert_array_equal(forecast, [[1, 2, 3, 4, 1, 2], [5, 6, 7, 8, 5, 6], [3] * 6])
+
+def test_holt_extends_linear_trend():
+    weeks = np.arange(1, 21)
+    history = pd.DataFrame({'sku': 'T', 'dc': 'North', 'week': weeks, 'demand': 1000 + 100 * weeks})
+    forecast = forecast_demand(history, periods=4, model='holt')
+    assert forecast['week'].tolist() == [21, 22, 23, 24]
+    np.testing.assert_allclose(forecast['demand'], 1000 + 100 * forecast['week'], rtol=0.01)
+
+def test_ses_on_level_series_and_backtest_errors():
+    history = make_ragged_history()
+    forecast = forecast_demand(history, periods=3, model='ses')
+    assert forecast.groupby('sku')['demand'].apply(set).to_dict() == {'A': {1000}, 'B': {2000}, 'C': {500}}
+    accuracy = backtest_forecast(history, model='ses', holdout=3)
+    assert accuracy.set_index('sku').loc[['A', 'B'], 'accuracy_score'].tolist() == [100.0, 100.0]
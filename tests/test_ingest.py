@@ -0,0 +1,12 @@
+import os
+import pandas as pd
+from planner.ingest import list_saved_plans, save_plan
+
+def test_list_saved_plans_returns_relative_columnar_files(tmp_path):
+    plan = pd.DataFrame({'sku': ['Regular'], 'dc': ['North'], 'week': [1], 'shipped': [5000]})
+    os.makedirs(tmp_path / 'march')
+    save_plan(plan, str(tmp_path / 'plan.parquet'))
+    save_plan(plan, str(tmp_path / 'march' / 'plan.feather'))
+    save_plan(plan, str(tmp_path / 'plan.csv'))
+    assert list_saved_plans(str(tmp_path)) == [os.path.join('march', 'plan.feather'), 'plan.parquet']
+    assert list_saved_plans(str(tmp_path / 'missing')) == []
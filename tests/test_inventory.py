@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from planner.inventory import time_phased_plan
+from planner.synthetic import generate_demand
+
+LEAD_TIMES = {'DC000': 1, 'DC001': 3}
+
+def loop_time_phased_plan(df, lead_time_map, opening_stock, default_lead_time=1):
+    rows = []
+    for _, group in df.groupby(['sku', 'dc'], observed=True):
+        group = group.sort_values('week')
+        lead_time = lead_time_map.get(group['dc'].iloc[0], default_lead_time)
+        received = demanded = 0
+        for week, demand in zip(group['week'], group['demand']):
+            previous = received
+            received = group.loc[group['week'] <= week - lead_time, 'shipped'].sum()
+            demanded += demand
+            rows.append({'sku': group['sku'].iloc[0], 'dc': group['dc'].iloc[0], 'week': week,
+                         'receipts': received - previous, 'closing_inventory': opening_stock + received - demanded})
+    return pd.DataFrame(rows)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_time_phased_plan_matches_series_loop_with_gaps(seed):
+    rng = np.random.default_rng(seed)
+    df = generate_demand(4, 3, 12, base_demand=5000, seed=seed)
+    df = df[rng.random(len(df)) > 0.3].sample(frac=1, random_state=seed)
+    df['shipped'] = (df['demand'] // 1000) * 1000
+    
+    result = time_phased_plan(df, LEAD_TIMES, opening_stock=8000, safety_stock=5000)
+    expected = loop_time_phased_plan(df, LEAD_TIMES, opening_stock=8000)
+    
+    columns = ['sku', 'dc', 'week', 'receipts', 'closing_inventory']
+    result = result[columns].astype({'sku': str, 'dc': str}).sort_values(['sku', 'dc', 'week']).reset_index(drop=True)
+    expected = expected.astype({'sku': str, 'dc': str}).sort_values(['sku', 'dc', 'week']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from planner.optimization import optimize_allocation
+from planner.production import get_weekly_capacity
+
+LEAD_TIMES = {'North': 1, 'South': 2}
+
+def make_demand():
+    return pd.DataFrame({'sku': 'Regular', 'dc': ['North'] * 6 + ['South'] * 6, 'week': list(range(1, 7)) * 2,
+                         'demand': [15000] * 6 + [5000] * 6})
+
+def test_lp_respects_capacity_and_lead_time():
+    result = optimize_allocation(make_demand(), 20000, lead_time_map=LEAD_TIMES, safety_stock=0)
+    
+    weekly = result.groupby('week')['allocated'].sum()
+    assert (weekly <= weekly.index.map(lambda week: get_weekly_capacity(week, 20000))).all()
+    
+    for dc, lead_time in LEAD_TIMES.items():
+        series = result[result['dc'] == dc].sort_values('week')
+        allocated = series['allocated'].to_numpy()
+        receipts = np.r_[np.zeros(lead_time), allocated[:-lead_time]]
+        inventory = series['planned_inventory'].to_numpy()
+        expected = np.r_[0, inventory[:-1]] + receipts - series['demand'].to_numpy() + series['planned_shortage'].to_numpy()
+        np.testing.assert_allclose(inventory, expected, atol=1)
+        assert (allocated[-lead_time:] == 0).all()
+        assert (series['planned_shortage'].to_numpy()[:lead_time] == series['demand'].to_numpy()[:lead_time]).all()
+    
+    assert result['planned_shortage'].sum() == 15000 + 2 * 5000 + 3000
+
+def test_lp_meets_demand_with_spare_capacity():
+    result = optimize_allocation(make_demand(), 30000, lead_time_map=LEAD_TIMES, safety_stock=0)
+    assert result['allocated'].tolist() == [15000] * 5 + [0] + [5000] * 4 + [0, 0]
+    assert result['planned_shortage'].tolist() == [15000] + [0] * 5 + [5000, 5000] + [0] * 4
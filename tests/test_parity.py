@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from planner.forecasting import forecast_demand
+from planner.production import allocate_production, get_weekly_capacity
+from planner.synthetic import generate_demand
+
+def loop_allocate_production(demand_df, max_capacity=150000):
+    week_data = []
+    for week in sorted(demand_df['week'].unique()):
+        week_df = demand_df[demand_df['week'] == week].copy()
+        total_demand = week_df['demand'].sum()
+        weekly_capacity = get_weekly_capacity(week, max_capacity)
+        if total_demand <= weekly_capacity:
+            week_df['allocated'] = week_df['demand']
+        elif total_demand > 0:
+            week_df['allocated'] = (week_df['demand'] / total_demand) * weekly_capacity
+        else:
+            week_df['allocated'] = 0
+        week_df['allocated'] = week_df['allocated'].astype(int)
+        week_data.append(week_df)
+    return pd.concat(week_data, ignore_index=True)
+
+def loop_forecast_demand(history_df, periods=6):
+    forecast_results = []
+    for (sku, dc), group in history_df.groupby(['sku', 'dc']):
+        avg_demand = max(1000, group['demand'].mean())
+        last_week = group['week'].max()
+        for i in range(periods):
+            demand = max(500, int(avg_demand * (0.9 + 0.2 * (i % 3))))
+            forecast_results.append(pd.DataFrame({'sku': [sku], 'dc': [dc], 'week': [last_week + i + 1],
+                                                  'demand': [demand]}))
+    return pd.concat(forecast_results, ignore_index=True)
+
+def make_demand(seed=0):
+    df = generate_demand(4, 3, 8, base_demand=11000, noise=0.5, seed=seed)
+    df.loc[df['week'] == 2, 'demand'] = 0
+    df.loc[df['week'] == 5, 'demand'] *= 3
+    df.loc[(df['week'] == 7) & (df['sku'] == 'SKU00001'), 'demand'] = 250
+    return df
+
+def sorted_frame(df):
+    return df.sort_values(['sku', 'dc', 'week']).reset_index(drop=True)
+
+@pytest.mark.parametrize('max_capacity', [150000, 60000])
+def test_allocate_production_matches_week_loop(max_capacity):
+    demand_df = make_demand()
+    weekly = demand_df.groupby('week')['demand'].sum()
+    capacity = weekly.index.map(lambda week: get_weekly_capacity(week, max_capacity))
+    assert (weekly > capacity).any() and (weekly <= capacity).any() and (weekly == 0).any()
+    
+    expected = loop_allocate_production(demand_df, max_capacity)
+    result = allocate_production(demand_df, max_capacity)
+    pd.testing.assert_frame_equal(sorted_frame(result), sorted_frame(expected), check_dtype=False)
+
+@pytest.mark.parametrize('periods', [1, 6, 12])
+def test_forecast_demand_matches_group_loop(periods):
+    history_df = make_demand()
+    expected = loop_forecast_demand(history_df, periods)
+    result = forecast_demand(history_df, periods=periods)
+    pd.testing.assert_frame_equal(sorted_frame(result), sorted_frame(expected), check_dtype=False)
@@ -0,0 +1,26 @@
+from planner.pipeline import PlanningPipeline
+from planner.synthetic import generate_demand
+
+LP_OPTIONS = {'lead_time_map': None, 'truck_size': 5000, 'safety_stock': 5000, 'opening_stock': 0,
+              'production_cost': 1.0, 'transport_cost': 200.0, 'inventory_cost': 0.5}
+
+def test_truck_change_reuses_allocation():
+    pipeline = PlanningPipeline()
+    demand_df = generate_demand(3, 2, 8, base_demand=20000)
+    pipeline.run(demand_df, truck_size=5000, lp_options=dict(LP_OPTIONS))
+    pipeline.run(demand_df, truck_size=10000, lp_options=dict(LP_OPTIONS, truck_size=10000))
+    assert pipeline.recomputed == ['shipment', 'metrics']
+
+def test_cost_change_reuses_proportional_allocation():
+    pipeline = PlanningPipeline()
+    demand_df = generate_demand(3, 2, 8, base_demand=20000)
+    pipeline.run(demand_df, lp_options=dict(LP_OPTIONS))
+    pipeline.run(demand_df, lp_options=dict(LP_OPTIONS, transport_cost=500.0))
+    assert pipeline.recomputed == []
+
+def test_capacity_change_reruns_allocation():
+    pipeline = PlanningPipeline()
+    demand_df = generate_demand(3, 2, 8, base_demand=20000)
+    pipeline.run(demand_df, max_capacity=150000)
+    pipeline.run(demand_df, max_capacity=100000)
+    assert pipeline.recomputed == ['allocation', 'shipment', 'metrics']
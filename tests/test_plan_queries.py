@@ -0,0 +1,29 @@
+import numpy as np
+from planner.synthetic import generate_demand
+from database.db_utils import create_tables, save_shipment_plan
+from database.plan_queries import filter_frame, load_plan_page, violation_counts
+from planner.production import allocate_production
+from planner.metrics import classify_violations, violation_index
+from planner.shipment import enhanced_truck_planning
+
+def test_sql_pages_match_in_memory_classification(tmp_path):
+    db_path = str(tmp_path / 'plan.db')
+    create_tables(db_path)
+    demand = generate_demand(6, 3, 10, base_demand=6000)
+    plan = enhanced_truck_planning(allocate_production(demand, 200000), 5000, 'partial', 0.6, 0)
+    run_id = save_shipment_plan(plan, db_path=db_path)
+    filters = {'weeks': [2, 3, 4, 5], 'dcs': sorted(plan['dc'].unique())[:2]}
+    expected = filter_frame(plan, **filters).sort_values(['week', 'dc', 'sku']).reset_index(drop=True)
+    status = classify_violations(expected, 70)
+
+    counts = violation_counts(run_id, 70, db_path=db_path, **filters)
+    assert counts == {name: count for name, count in status.value_counts().items() if count}
+
+    for violations_only in (False, True):
+        rows = violation_index(status) if violations_only else np.arange(len(expected))
+        pages = [load_plan_page(run_id, 70, 7, offset, violations_only, db_path=db_path, **filters)
+                 for offset in range(0, len(rows), 7)]
+        assert all(len(page) <= 7 for page in pages)
+        fetched = [status for page in pages for status in page['status']]
+        assert fetched == list(status[rows])
+        assert [sku for page in pages for sku in page['sku']] == expected['sku'].iloc[rows].tolist()
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from planner.production import allocate_production, get_weekly_capacity
+from planner.synthetic import generate_demand
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('use_priority', [False, True])
+def test_largest_remainder_fills_capacity_exactly(seed, use_priority):
+    demand_df = generate_demand(7, 3, 8, base_demand=5000, noise=0.5, seed=seed)
+    priority = None
+    if use_priority:
+        rng = np.random.default_rng(seed)
+        priority = dict(zip(demand_df['sku'].cat.categories, rng.uniform(0.5, 3.0, 7)))
+    max_capacity = int(demand_df.groupby('week')['demand'].sum().median())
+    result = allocate_production(demand_df, max_capacity, 'largest_remainder', priority=priority)
+    
+    weekly = result.groupby('week').agg(demand=('demand', 'sum'), allocated=('allocated', 'sum'))
+    capacity = weekly.index.map(lambda week: get_weekly_capacity(week, max_capacity)).to_numpy()
+    over = weekly['demand'].to_numpy() > capacity
+    assert over.any() and (~over).any()
+    np.testing.assert_array_equal(weekly['allocated'].to_numpy()[over], capacity[over])
+    np.testing.assert_array_equal(weekly['allocated'].to_numpy()[~over], weekly['demand'].to_numpy()[~over])
+    assert (result['allocated'] <= result['demand']).all()
+    assert (result['allocated'] >= 0).all()
+
+def test_priority_breaks_remainder_ties():
+    demand_df = pd.DataFrame({'sku': ['Regular', 'Diet', 'Zero'], 'dc': 'North', 'week': 1, 'demand': 70000})
+    for favoured in ('Regular', 'Diet', 'Zero'):
+        result = allocate_production(demand_df, 100000, 'largest_remainder', priority={favoured: 2.0})
+        assert result.set_index('sku')['allocated'].to_dict() == {
+            sku: 33334 if sku == favoured else 33333 for sku in ('Regular', 'Diet', 'Zero')}
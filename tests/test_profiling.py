@@ -0,0 +1,15 @@
+import numpy as np
+from planner.profiling import StageProfiler
+
+def test_tracemalloc_peaks_are_per_stage():
+    profiler = StageProfiler('tracemalloc')
+    with profiler.stage('outer'):
+        with profiler.stage('large'):
+            np.ones(4 * 2**20 // 8).sum()
+        with profiler.stage('small'):
+            np.ones(2**20 // 8).sum()
+    peaks = profiler.to_frame().set_index('stage')['stage_peak_mb']
+    assert 4 <= peaks['large'] < 4.5
+    assert 1 <= peaks['small'] < 1.5
+    assert peaks['outer'] >= peaks['large']
+    assert profiler.to_frame()['max_rss_growth_mb'].notna().all()
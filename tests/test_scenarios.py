@@ -0,0 +1,14 @@
+from planner.pipeline import PlanningPipeline
+from planner.scenarios import run_scenario_sweep, scenario_grid
+from planner.synthetic import generate_demand
+
+def test_sweep_uses_fleet_and_matches_pipeline():
+    demand = generate_demand(4, 2, 6, base_demand=6000)
+    fleet = {'8k': (8000, 300.0), '12k': (12000, 400.0)}
+    scenarios = scenario_grid(max_capacity=[40000, 80000], strategy=['mixed_fleet', 'partial'])
+    sweep = run_scenario_sweep(demand, scenarios, fleet=fleet, max_workers=2)
+    pipeline = PlanningPipeline()
+    for row in sweep.itertuples():
+        _, metrics = pipeline.run(demand, max_capacity=row.max_capacity, strategy=row.strategy, fleet=fleet)
+        assert row.total_trucks == metrics['total_trucks']
+        assert row.service_level == metrics['service_level']
@@ -0,0 +1,38 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from planner.shipment import build_fleet_table, enhanced_truck_planning, lookup_fleet
+
+def test_next_week_batching_unshipped_is_backlog():
+    df = pd.DataFrame({
+        'sku': ['Regular'] * 4,
+        'dc': ['North'] * 4,
+        'week': [1, 2, 3, 4],
+        'allocated': [3000, 4000, 1000, 500],
+        'demand': [3000, 4000, 1000, 500]
+    })
+    plan = enhanced_truck_planning(df, truck_size=5000, strategy='next_week_batching', partial_threshold=0.6,
+                                   safety_stock=0)
+    assert plan['shipped'].tolist() == [0, 5000, 0, 3500]
+    assert plan['unshipped'].tolist() == [3000, 2000, 3000, 0]
+    assert (plan['unshipped'] >= 0).all()
+    assert plan['unshipped'].tolist() == plan['carried_out'].tolist()
+
+def brute_force_fleet_cost(load, capacities, costs):
+    ranges = [range(-(-load // capacity) + 1) for capacity in capacities]
+    return min(np.dot(counts, costs) for counts in itertools.product(*ranges) if np.dot(counts, capacities) >= load)
+
+@pytest.mark.parametrize('fleet', [
+    {'a': (3000, 100.0), 'b': (7000, 200.0), 'c': (11000, 330.0)},
+    {'a': (4000, 130.0), 'b': (6000, 170.0), 'c': (9000, 260.0)},
+    {'5k': (5000, 150.0), '10k': (10000, 250.0), '20k': (20000, 420.0)}
+])
+def test_lookup_fleet_matches_brute_force(fleet):
+    table = build_fleet_table(fleet)
+    loads = np.arange(0, 80001, 500)
+    counts, cost = lookup_fleet(table, loads)
+    assert (counts @ table['capacities'] >= loads).all()
+    np.testing.assert_allclose(counts @ table['costs'], cost)
+    expected = [brute_force_fleet_cost(load, table['capacities'], table['costs']) for load in loads]
+    np.testing.assert_allclose(cost, expected)
@@ -0,0 +1,19 @@
+import numpy as np
+from planner.pipeline import PlanningPipeline
+from planner.simulation import simulate_demand_risk
+from planner.synthetic import generate_demand
+
+def test_zero_noise_simulation_matches_pipeline():
+    demand_df = generate_demand(5, 3, 8, base_demand=8000, seed=3)
+    settings = {'max_capacity': 100000, 'truck_size': 5000, 'partial_threshold': 0.6, 'safety_stock': 5000}
+    noise_model = demand_df[['sku', 'dc']].drop_duplicates().assign(cv=0.0)
+    summary, row_risk = simulate_demand_risk(demand_df, noise_model, trials=5, **settings)
+    shipment_df, metrics = PlanningPipeline().run(demand_df, strategy='partial', **settings)
+    
+    summary = summary.set_index('metric')
+    assert (summary.loc[['service_level', 'total_trucks', 'truck_utilization'], 'p10']
+            == summary.loc[['service_level', 'total_trucks', 'truck_utilization'], 'p90']).all()
+    np.testing.assert_allclose(summary.loc['service_level', 'mean'], metrics['service_level'], rtol=1e-6)
+    assert summary.loc['total_trucks', 'mean'] == metrics['total_trucks']
+    np.testing.assert_allclose(summary.loc['truck_utilization', 'mean'], metrics['truck_utilization'], rtol=1e-4)
+    np.testing.assert_array_equal(row_risk['breach_probability'].to_numpy() == 1, ~shipment_df['safety_met'].to_numpy())
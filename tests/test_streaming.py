@@ -0,0 +1,27 @@
+import io
+import pandas as pd
+import pytest
+from planner.production import allocate_production
+from planner.shipment import enhanced_truck_planning
+from planner.streaming import plan_streaming
+from planner.synthetic import generate_demand
+
+KEYS = ['sku', 'dc', 'week']
+PLAN_COLUMNS = ['allocated', 'shipped', 'total_trucks', 'unshipped', 'safety_met']
+
+@pytest.mark.parametrize('strategy', ['partial', 'consolidation', 'next_week_batching', 'mixed_fleet', 'full_trucks'])
+def test_streaming_matches_in_memory(strategy):
+    demand_df = generate_demand(n_skus=6, n_dcs=3, n_weeks=10, base_demand=6000)
+    data = demand_df.to_csv(index=False).encode('utf-8')
+    
+    expected = enhanced_truck_planning(allocate_production(demand_df, 60000), 5000, strategy, 0.6, 5000)
+    chunks = []
+    metrics = plan_streaming(io.BytesIO(data), max_capacity=60000, strategy=strategy, chunksize=25,
+                             sink=chunks.append)
+    streamed = pd.concat(chunks, ignore_index=True)
+    
+    expected = expected.astype({'sku': str, 'dc': str}).sort_values(KEYS).reset_index(drop=True)
+    streamed = streamed.astype({'sku': str, 'dc': str}).sort_values(KEYS).reset_index(drop=True)
+    pd.testing.assert_frame_equal(streamed[KEYS + PLAN_COLUMNS], expected[KEYS + PLAN_COLUMNS], check_dtype=False)
+    assert metrics['total_trucks'] == expected['total_trucks'].sum()
+    assert metrics['total_shipped'] == expected['shipped'].sum()